@@ -0,0 +1,273 @@
+"""
+End-to-end load generator for the compose stack (docker compose up: API on 127.0.0.1:8001).
+
+    python bench/loadgen.py run --rate 200 --duration 30 --mix noop:9,always_fail:1
+    python bench/loadgen.py run --rate 50 --mix noop --payload 'noop={"sleep_ms": 20}' \
+        --worker-metrics http://127.0.0.1:9101/metrics --worker-metrics http://127.0.0.1:9102/metrics
+    python bench/loadgen.py compare bench/results/a.json bench/results/b.json
+
+Submits jobs with POST /jobs at a fixed rate (open loop: a slow system does not slow the
+submissions down), waits for each one with GET /jobs/{id}/result?wait=, then reads its row
+timestamps. Per job:
+  enqueue     POST /jobs round trip
+  queue_wait  started_at - created_at
+  execution   succeeded_at / failed_at - started_at (first attempt to final outcome for retried jobs)
+  end_to_end  POST sent -> final status seen by the client
+Throughput is finished jobs over the time from the first submission to the last completion.
+Per worker, it is the rise of each worker's worker_job_succeeded_total + worker_job_failed_total
+(scraped from --worker-metrics before and after) over that same time: everything the worker
+finished meanwhile, so run it on an otherwise idle stack.
+Results are written as JSON under bench/results/ for `compare`. Needs httpx (pip install httpx).
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from stats import compare, summarize, write_report  # noqa: E402
+
+FINAL_STATUSES = ("succeeded", "failed")
+TIMING_FIELDS = "created_at,started_at,succeeded_at,failed_at"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+@dataclass
+class Sample:
+    job_type: str
+    status: str  # succeeded, failed, timeout or error
+    enqueue: float | None = None
+    queue_wait: float | None = None
+    execution: float | None = None
+    end_to_end: float | None = None
+
+
+def parse_mix(spec: str) -> list[tuple[str, int]]:
+    """
+    "noop:9,always_fail:1" -> [("noop", 9), ("always_fail", 1)]; the weight defaults to 1.
+    """
+    mix = []
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition(":")
+        if name:
+            mix.append((name, int(weight) if weight else 1))
+    if not mix:
+        raise argparse.ArgumentTypeError("the job mix must name at least one job type")
+    return mix
+
+
+def parse_payloads(items: list[str]) -> dict[str, dict]:
+    payloads = {}
+    for item in items:
+        job_type, _, payload = item.partition("=")
+        payloads[job_type] = json.loads(payload)
+    return payloads
+
+
+def _seconds_between(row: dict, start: str, end: str) -> float | None:
+    if not row.get(start) or not row.get(end):
+        return None
+    return (datetime.fromisoformat(row[end]) - datetime.fromisoformat(row[start])).total_seconds()
+
+
+async def run_job(
+        submit: httpx.AsyncClient,
+        poll: httpx.AsyncClient,
+        job_type: str,
+        payload: dict,
+        timeout: float,
+) -> Sample:
+    sent = time.perf_counter()
+    try:
+        res = await submit.post("/jobs", json={"type": job_type, "payload": payload})
+        res.raise_for_status()
+    except httpx.HTTPError:
+        return Sample(job_type, "error")
+    enqueue = time.perf_counter() - sent
+    job = res.json()
+
+    status = job["status"]
+    deadline = sent + timeout
+    try:
+        while status not in FINAL_STATUSES and (remaining := deadline - time.perf_counter()) > 0:
+            res = await poll.get(f"/jobs/{job['id']}/result", params={"wait": f"{min(remaining, 30):.1f}s"})
+            res.raise_for_status()
+            status = res.json()["status"]
+        end_to_end = time.perf_counter() - sent
+        if status not in FINAL_STATUSES:
+            return Sample(job_type, "timeout", enqueue=enqueue)
+
+        res = await poll.get(f"/jobs/{job['id']}", params={"fields": TIMING_FIELDS})
+        res.raise_for_status()
+        row = res.json()
+    except httpx.HTTPError:
+        return Sample(job_type, "error", enqueue=enqueue)
+
+    return Sample(
+        job_type,
+        status,
+        enqueue=enqueue,
+        queue_wait=_seconds_between(row, "created_at", "started_at"),
+        execution=_seconds_between(row, "started_at", "succeeded_at" if status == "succeeded" else "failed_at"),
+        end_to_end=end_to_end,
+    )
+
+
+async def worker_finished_totals(client: httpx.AsyncClient, urls: list[str]) -> dict[str, float | None]:
+    # url -> jobs finished so far according to the worker's counters (None: not reachable)
+    totals: dict[str, float | None] = {}
+    for url in urls:
+        try:
+            response = await client.get(url)
+            response.raise_for_status()
+        except httpx.HTTPError:
+            totals[url] = None
+            continue
+        totals[url] = sum(
+            float(line.rsplit(" ", 1)[1])
+            for line in response.text.splitlines()
+            if line.startswith(("worker_job_succeeded_total{", "worker_job_failed_total{"))
+        )
+    return totals
+
+
+def latency_report(samples: list[Sample]) -> dict:
+    return {
+        name: summarize([v for s in samples if (v := getattr(s, name)) is not None])
+        for name in ("enqueue", "queue_wait", "execution", "end_to_end")
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    mix = parse_mix(args.mix)
+    payloads = parse_payloads(args.payload)
+    types, weights = zip(*mix)
+    rng = random.Random(args.seed)
+    total = int(args.rate * args.duration)
+
+    # separate pools: long-polls must not hold up submissions
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    timeout = httpx.Timeout(60.0)
+    async with (
+        httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout) as submit,
+        httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout) as poll,
+        httpx.AsyncClient(timeout=10.0) as scrape,
+    ):
+        in_flight = asyncio.Semaphore(args.max_in_flight)
+        tasks: list[asyncio.Task] = []
+        behind = 0.0  # how late the last submission went out, > 0 means the client is the bottleneck
+
+        async def one(job_type: str) -> Sample:
+            try:
+                return await run_job(submit, poll, job_type, payloads.get(job_type, {}), args.job_timeout)
+            finally:
+                in_flight.release()
+
+        finished_before = await worker_finished_totals(scrape, args.worker_metrics)
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        for i in range(total):
+            target = started + i / args.rate
+            if (delay := target - time.perf_counter()) > 0:
+                await asyncio.sleep(delay)
+            await in_flight.acquire()
+            behind = max(behind, time.perf_counter() - target)
+            tasks.append(asyncio.create_task(one(rng.choices(types, weights)[0])))
+
+        samples = await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+        finished_after = await worker_finished_totals(scrape, args.worker_metrics)
+
+    finished = [s for s in samples if s.status in FINAL_STATUSES]
+    jobs_per_second = len(finished) / elapsed if elapsed else 0.0
+    by_worker = {
+        url: (after - before) / elapsed
+        for url, before in finished_before.items()
+        if before is not None and (after := finished_after.get(url)) is not None and elapsed
+    }
+    return {
+        "name": args.name,
+        "started_at": started_at.isoformat(),
+        "config": {
+            "base_url": args.base_url,
+            "rate": args.rate,
+            "duration": args.duration,
+            "mix": dict(mix),
+            "payloads": payloads,
+            "worker_metrics": args.worker_metrics,
+            "connections": args.connections,
+            "max_in_flight": args.max_in_flight,
+            "seed": args.seed,
+        },
+        "jobs": {
+            status: sum(1 for s in samples if s.status == status)
+            for status in ("succeeded", "failed", "timeout", "error")
+        } | {"submitted": len(samples)},
+        "throughput": {
+            "elapsed_seconds": elapsed,
+            "jobs_per_second": jobs_per_second,
+            # mean over the workers that could be scraped (None: none could)
+            "jobs_per_second_per_worker": sum(by_worker.values()) / len(by_worker) if by_worker else None,
+            "jobs_per_second_by_worker": by_worker,
+            "max_submit_lag_seconds": behind,
+        },
+        "latency_seconds": latency_report(samples),
+        "by_type": {job_type: latency_report([s for s in samples if s.job_type == job_type]) for job_type in types},
+    }
+
+
+def print_summary(report: dict) -> None:
+    print(json.dumps(report["jobs"]), f"{report['throughput']['jobs_per_second']:.1f} jobs/s")
+    for name, stats in report["latency_seconds"].items():
+        if stats["count"]:
+            print(
+                f"{name:<11} p50 {stats['p50'] * 1000:8.1f} ms  p95 {stats['p95'] * 1000:8.1f} ms"
+                f"  p99 {stats['p99'] * 1000:8.1f} ms  (n={stats['count']})"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="generate load and write a report")
+    run_parser.add_argument("--base-url", default="http://127.0.0.1:8001")
+    run_parser.add_argument("--rate", type=float, default=50.0, help="jobs submitted per second")
+    run_parser.add_argument("--duration", type=float, default=30.0, help="seconds of submissions")
+    run_parser.add_argument("--mix", default="noop", help='job types with weights, e.g. "noop:9,always_fail:1"')
+    run_parser.add_argument("--payload", action="append", default=[], metavar="TYPE=JSON", help="payload per job type")
+    run_parser.add_argument(
+        "--worker-metrics", action="append", default=[], metavar="URL",
+        help="metrics endpoint of a worker serving the run, once per worker (e.g. http://127.0.0.1:9101/metrics)",
+    )
+    run_parser.add_argument("--connections", type=int, default=100, help="HTTP connections per pool")
+    run_parser.add_argument("--max-in-flight", type=int, default=10_000, help="unfinished jobs before submissions wait")
+    run_parser.add_argument("--job-timeout", type=float, default=120.0, help="give up on a job after this long")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--name", default="loadgen")
+    run_parser.add_argument("--out", type=Path, help="report path (default: bench/results/<name>-<time>.json)")
+
+    compare_parser = sub.add_parser("compare", help="compare two reports (of this script or micro.py)")
+    compare_parser.add_argument("a", type=Path)
+    compare_parser.add_argument("b", type=Path)
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        compare(args.a, args.b)
+        return
+
+    report = asyncio.run(run(args))
+    print_summary(report)
+    out = args.out or RESULTS_DIR / f"{args.name}-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+    write_report(report, out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import json
+import math
+from pathlib import Path
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """
+    Nearest-rank percentile (q in 0..100) of an already sorted list.
+    """
+    if not sorted_values:
+        return math.nan
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(values: list[float]) -> dict:
+    """
+    count, mean, p50/p95/p99 and max of a list of samples (seconds); empty lists give count 0 only.
+    """
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1],
+    }
+
+
+def write_report(report: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+    print(f"wrote {path}")
+
+
+def flatten(report: dict, prefix: str = "") -> dict[str, float]:
+    """
+    Numeric leaves of a report as "a.b.c" -> value, for comparing two runs.
+    """
+    flat: dict[str, float] = {}
+    for key, value in report.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(a_path: Path, b_path: Path) -> None:
+    """
+    Prints the numeric results of two reports side by side (not their config), with the change from a to b.
+    """
+    a = flatten({s: v for s, v in json.loads(a_path.read_text()).items() if s != "config"})
+    b = flatten({s: v for s, v in json.loads(b_path.read_text()).items() if s != "config"})
+    width = max((len(name) for name in a.keys() | b.keys()), default=10)
+    print(f"{'metric':<{width}}  {'a':>12}  {'b':>12}  {'change':>8}")
+    for name in sorted(a.keys() | b.keys()):
+        va, vb = a.get(name), b.get(name)
+        change = f"{(vb - va) / va:+.1%}" if va and vb is not None else ""
+        print(f"{name:<{width}}  {_fmt(va):>12}  {_fmt(vb):>12}  {change:>8}")
+
+
+def _fmt(value: float | None) -> str:
+    if value is None:
+        return "-"
+    return f"{value:.0f}" if float(value).is_integer() else f"{value:.6g}"
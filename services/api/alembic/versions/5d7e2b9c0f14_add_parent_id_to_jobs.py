@@ -0,0 +1,35 @@
+"""add parent_id to jobs
+
+Revision ID: 5d7e2b9c0f14
+Revises: 9a41f0c2d6e3
+Create Date: 2026-10-18 14:02:31.448190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7e2b9c0f14'
+down_revision: Union[str, Sequence[str], None] = '9a41f0c2d6e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('parent_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_foreign_key(
+        'fk_jobs_parent_id_jobs', 'jobs', 'jobs', ['parent_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_index(op.f('ix_jobs_parent_id'), 'jobs', ['parent_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_jobs_parent_id'), table_name='jobs')
+    op.drop_constraint('fk_jobs_parent_id_jobs', 'jobs', type_='foreignkey')
+    op.drop_column('jobs', 'parent_id')
@@ -0,0 +1,30 @@
+"""add queue to jobs and job_outbox
+
+Revision ID: 9a41f0c2d6e3
+Revises: 3c9d2e7a4b10
+Create Date: 2026-10-18 11:40:05.917254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a41f0c2d6e3'
+down_revision: Union[str, Sequence[str], None] = '3c9d2e7a4b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('queue', sa.String(length=50), server_default='default', nullable=False))
+    op.add_column('job_outbox', sa.Column('queue', sa.String(length=50), server_default='default', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('job_outbox', 'queue')
+    op.drop_column('jobs', 'queue')
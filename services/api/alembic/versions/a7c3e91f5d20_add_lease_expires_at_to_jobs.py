@@ -0,0 +1,39 @@
+"""add lease_expires_at to jobs
+
+Revision ID: a7c3e91f5d20
+Revises: f6a2c8d41b93
+Create Date: 2026-10-18 19:12:07.318842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e91f5d20'
+down_revision: Union[str, Sequence[str], None] = 'f6a2c8d41b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # postgres queue backend (QUEUE_BACKEND=postgres): reservations lease queued rows in place
+    op.add_column('jobs', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_jobs_queued_queue_created_at',
+            'jobs',
+            ['queue', 'created_at'],
+            postgresql_where=sa.text("status = 'queued'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_jobs_queued_queue_created_at', table_name='jobs', postgresql_concurrently=True)
+    op.drop_column('jobs', 'lease_expires_at')
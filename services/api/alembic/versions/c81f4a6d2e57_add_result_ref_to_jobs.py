@@ -0,0 +1,28 @@
+"""add result_ref to jobs
+
+Revision ID: c81f4a6d2e57
+Revises: 5d7e2b9c0f14
+Create Date: 2026-10-18 15:21:09.306612
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81f4a6d2e57'
+down_revision: Union[str, Sequence[str], None] = '5d7e2b9c0f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('result_ref', sa.String(length=80), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('jobs', 'result_ref')
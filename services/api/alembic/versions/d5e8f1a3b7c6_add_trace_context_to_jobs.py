@@ -0,0 +1,29 @@
+"""add trace_context to jobs
+
+Revision ID: d5e8f1a3b7c6
+Revises: a7c3e91f5d20
+Create Date: 2026-10-18 21:40:52.604113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e8f1a3b7c6'
+down_revision: Union[str, Sequence[str], None] = 'a7c3e91f5d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # tracing: the worker continues the trace of the request that created the job
+    op.add_column('jobs', sa.Column('trace_context', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('jobs', 'trace_context')
@@ -0,0 +1,54 @@
+"""add job listing indexes
+
+Revision ID: e3b5a9174c28
+Revises: c81f4a6d2e57
+Create Date: 2026-10-18 16:48:52.105734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b5a9174c28'
+down_revision: Union[str, Sequence[str], None] = 'c81f4a6d2e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY: no write lock on a large jobs table, but it can't run inside a transaction
+    with op.get_context().autocommit_block():
+        # GET /jobs keyset pagination, newest first, unfiltered or filtered by status / type
+        op.create_index('ix_jobs_created_at_id', 'jobs', ['created_at', 'id'], postgresql_concurrently=True)
+        op.create_index(
+            'ix_jobs_status_created_at_id', 'jobs', ['status', 'created_at', 'id'], postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_jobs_type_created_at_id', 'jobs', ['type', 'created_at', 'id'], postgresql_concurrently=True
+        )
+        op.create_index('ix_jobs_updated_at', 'jobs', ['updated_at'], postgresql_concurrently=True)
+        # due queued jobs: small, since almost every row is finished
+        op.create_index(
+            'ix_jobs_queued_run_after',
+            'jobs',
+            ['run_after'],
+            postgresql_where=sa.text("status = 'queued'"),
+            postgresql_concurrently=True,
+        )
+        # status alone is a prefix of ix_jobs_status_created_at_id
+        op.drop_index('ix_jobs_status', table_name='jobs', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_jobs_status', 'jobs', ['status'], postgresql_concurrently=True)
+        op.drop_index('ix_jobs_queued_run_after', table_name='jobs', postgresql_concurrently=True)
+        op.drop_index('ix_jobs_updated_at', table_name='jobs', postgresql_concurrently=True)
+        op.drop_index('ix_jobs_type_created_at_id', table_name='jobs', postgresql_concurrently=True)
+        op.drop_index('ix_jobs_status_created_at_id', table_name='jobs', postgresql_concurrently=True)
+        op.drop_index('ix_jobs_created_at_id', table_name='jobs', postgresql_concurrently=True)
@@ -0,0 +1,68 @@
+"""add partitioned jobs_archive
+
+Revision ID: f6a2c8d41b93
+Revises: e3b5a9174c28
+Create Date: 2026-10-18 18:05:44.620318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a2c8d41b93'
+down_revision: Union[str, Sequence[str], None] = 'e3b5a9174c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Finished jobs are moved here by the worker's retention loop (worker.retention), so the
+    # hot jobs table only holds recent work. Monthly partitions on created_at
+    # (jobs_archive_YYYY_MM) are created by that loop and dropped whole once expired.
+    op.execute("""
+        CREATE TABLE jobs_archive (
+            id UUID NOT NULL,
+            type VARCHAR(50) NOT NULL,
+            queue VARCHAR(50) NOT NULL,
+            parent_id UUID,
+            payload JSON NOT NULL,
+            result JSON,
+            result_ref VARCHAR(80),
+            idempotency_key VARCHAR(128),
+            attempts INTEGER NOT NULL,
+            max_attempts INTEGER NOT NULL,
+            run_after TIMESTAMP WITH TIME ZONE,
+            status job_status NOT NULL,
+            started_at TIMESTAMP WITH TIME ZONE,
+            succeeded_at TIMESTAMP WITH TIME ZONE,
+            failed_at TIMESTAMP WITH TIME ZONE,
+            error TEXT,
+            last_error TEXT,
+            last_error_at TIMESTAMP WITH TIME ZONE,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            archived_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.create_index('ix_jobs_archive_parent_id', 'jobs_archive', ['parent_id'], unique=False)
+    # retention candidates, oldest first: finished top-level jobs
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_jobs_finished_updated_at',
+            'jobs',
+            ['updated_at'],
+            postgresql_where=sa.text("parent_id IS NULL AND status IN ('succeeded', 'failed')"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_jobs_finished_updated_at', table_name='jobs', postgresql_concurrently=True)
+    op.execute("DROP TABLE jobs_archive")
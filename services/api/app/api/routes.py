@@ -1,19 +1,34 @@
+import asyncio
+import base64
+import contextlib
+import json
 import time
+import uuid
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, Header
+from typing import AsyncIterator
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import select
+import orjson
+from sqlalchemy import insert, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
-from starlette.responses import  Response, JSONResponse
+from starlette.responses import  Response, JSONResponse, StreamingResponse
 
+from app.core.cache import job_cache
+from app.core.config import settings
+from app.core.queue import notify_jobs
+from app.core.results import result_path, stream_result
+from app.core.tracing import current_trace_context
 from app.db.session import AsyncSessionLocal
-from app.models.job import Job, JobStatus
-from app.schemas.job import JobCreate, JobOut
+from app.models.job import Job, JobStatus, jobs_archive
+from app.models.outbox import OutboxEntry
+from app.schemas.job import JobCreate, JobOut, JobBatchItem, JobBatchItemOut, JobBatchOut, JobListOut
 from app.schemas.result import JobResultOut
 from app.core.metrics import JOB_CREATED_TOTAL, JOB_GET_TOTAL, API_REQUEST_DURATION_SECONDS
-from app.core.queue import enqueue_job
+from app.relay import notify_outbox
+from app.events import FINAL_STATUSES, subscribe, wait_for_final_status
 
 router = APIRouter()
 
@@ -21,6 +36,12 @@ async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
 
+def json_response(content, status_code: int = 200, headers: dict | None = None) -> Response:
+    # read endpoints serve plain dicts of column values: serialized by orjson, no Pydantic round trip
+    return Response(
+        orjson.dumps(content), status_code=status_code, headers=headers, media_type="application/json"
+    )
+
 @router.get("/")
 async def root():
     return {"service": "jobrunner-api", "docs": "/docs"}
@@ -29,6 +50,20 @@ async def root():
 async def health():
     return {"status": "ok"}
 
+async def enqueue_in_transaction(db: AsyncSession, jobs: dict[uuid.UUID, str]) -> None:
+    """
+    Enqueues jobs (id -> queue) as part of the caller's transaction, so they are queued iff it commits:
+    - redis backend: outbox rows, pushed by app.relay after the commit
+    - postgres backend: the queued rows already are the queue, a NOTIFY wakes the workers
+    """
+    if not jobs:
+        return
+    if settings.queue_backend == "postgres":
+        await notify_jobs(db, set(jobs.values()))
+        return
+    await db.execute(insert(OutboxEntry).values([{"job_id": job_id, "queue": queue} for job_id, queue in jobs.items()]))
+
+
 @router.post("/jobs", response_model=JobOut, status_code=201)
 async def create_job(
         job_in: JobCreate,
@@ -38,18 +73,23 @@ async def create_job(
     start = time.perf_counter()
 
     job = Job(
+        id=uuid.uuid4(),
         type=job_in.type,
+        queue=job_in.queue,
         payload=job_in.payload,
         status=JobStatus.queued,
         idempotency_key=idempotency_key,
+        trace_context=current_trace_context(),
     )
 
     db.add(job)
 
     try:
+        # inside the try: this may flush the job, and a duplicate idempotency key fails at the flush
+        await enqueue_in_transaction(db, {job.id: job.queue})
         await db.commit()
+        notify_outbox()
         await db.refresh(job)
-        await enqueue_job(str(job.id))
         JOB_CREATED_TOTAL.labels(job_type=job_in.type).inc()
         API_REQUEST_DURATION_SECONDS.labels(method="POST", path="/jobs").observe(
             time.perf_counter() - start
@@ -69,7 +109,9 @@ async def create_job(
             raise HTTPException(status_code=500, detail="Idempotency conflict but job not found")
 
         if existing.status in (JobStatus.queued, JobStatus.running):
-            await enqueue_job(str(existing.id))
+            await enqueue_in_transaction(db, {existing.id: existing.queue})
+            await db.commit()
+            notify_outbox()
 
         API_REQUEST_DURATION_SECONDS.labels(method="POST", path="/jobs").observe(
             time.perf_counter() - start
@@ -77,60 +119,336 @@ async def create_job(
 
         return JSONResponse(status_code=200, content=jsonable_encoder(existing))
 
+@router.post("/jobs:batch", response_model=JobBatchOut)
+async def create_jobs_batch(items: list[JobBatchItem], db: AsyncSession = Depends(get_db)):
+    """
+    Bulk submission: one multi-row INSERT ... ON CONFLICT (idempotency_key) DO NOTHING,
+    one lookup for the conflicting keys, one multi-row outbox INSERT, one commit.
+    """
+    start = time.perf_counter()
+
+    if not items:
+        raise HTTPException(status_code=422, detail="Batch must contain at least one job")
+    if len(items) > settings.batch_max_jobs:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {settings.batch_max_jobs} jobs")
+
+    trace_context = current_trace_context()
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "type": item.type,
+            "queue": item.queue,
+            "payload": item.payload,
+            "status": JobStatus.queued,
+            "idempotency_key": item.idempotency_key,
+            "trace_context": trace_context,
+        }
+        for item in items
+    ]
+
+    res = await db.execute(
+        pg_insert(Job)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[Job.idempotency_key])
+        .returning(Job.id)
+    )
+    inserted = set(res.scalars().all())
+
+    # rows that hit an existing key (including a duplicate key earlier in this batch)
+    conflicting_keys = [row["idempotency_key"] for row in rows if row["id"] not in inserted]
+    existing: dict[str, tuple[uuid.UUID, str, JobStatus]] = {}
+    if conflicting_keys:
+        res = await db.execute(
+            select(Job.id, Job.idempotency_key, Job.queue, Job.status)
+            .where(Job.idempotency_key.in_(conflicting_keys))
+        )
+        existing = {row.idempotency_key: (row.id, row.queue, row.status) for row in res}
+
+    outcomes: list[JobBatchItemOut] = []
+    to_enqueue: dict[uuid.UUID, str] = {}  # job id -> queue, ordered, de-duplicated
+    for index, row in enumerate(rows):
+        if row["id"] in inserted:
+            job_id, queue, status, created = row["id"], row["queue"], JobStatus.queued, True
+            JOB_CREATED_TOTAL.labels(job_type=row["type"]).inc()
+        else:
+            found = existing.get(row["idempotency_key"])
+            if found is None:
+                raise HTTPException(status_code=500, detail="Idempotency conflict but job not found")
+            job_id, queue, status = found
+            created = False
+
+        # same rule as POST /jobs: (re)enqueue anything that is not finished yet
+        if status in (JobStatus.queued, JobStatus.running):
+            to_enqueue[job_id] = queue
+
+        outcomes.append(
+            JobBatchItemOut(
+                index=index,
+                id=job_id,
+                status=status.value,
+                created=created,
+                idempotency_key=row["idempotency_key"],
+            )
+        )
+
+    await enqueue_in_transaction(db, to_enqueue)
+    await db.commit()
+    notify_outbox()
+
+    API_REQUEST_DURATION_SECONDS.labels(method="POST", path="/jobs:batch").observe(
+        time.perf_counter() - start
+    )
+
+    return JSONResponse(status_code=200, content=jsonable_encoder(JobBatchOut(items=outcomes)))
+
+# columns served by the read endpoints; each maps to a jobs column of the same name
+JOB_FIELDS = tuple(JobOut.model_fields)
+RESULT_FIELDS = (*JobResultOut.model_fields, "result_ref", "run_after")
+
+# GET /jobs without fields=: everything but the potentially large payload and result
+LIST_FIELDS = (
+    "id", "type", "queue", "parent_id", "status", "attempts", "max_attempts",
+    "error", "created_at", "updated_at", "run_after",
+)
+
+@router.get("/jobs", response_model=JobListOut)
+async def list_jobs(
+        status: list[JobStatus] | None = Query(default=None, description="Repeat for several statuses"),
+        type: str | None = None,
+        queue: str | None = None,
+        parent_id: uuid.UUID | None = None,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        updated_after: datetime | None = None,
+        updated_before: datetime | None = None,
+        fields: str | None = Query(default=None, description="Comma-separated fields per item"),
+        limit: int = Query(default=50, ge=1, le=500),
+        cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
+        db: AsyncSession = Depends(get_db),
+):
+    """
+    Newest first, keyset-paginated on (created_at, id): every page is an index range scan,
+    however deep, where OFFSET would read and discard all the rows before it.
+    """
+    start = time.perf_counter()
+    selected = parse_fields(fields) if fields else LIST_FIELDS
+    # the cursor is built from the last row's sort key, so always read it
+    wanted = tuple(dict.fromkeys((*selected, "created_at", "id")))
+
+    stmt = select(*(Job.__table__.c[name] for name in wanted))
+    if status:
+        stmt = stmt.where(Job.status.in_(status))
+    if type is not None:
+        stmt = stmt.where(Job.type == type)
+    if queue is not None:
+        stmt = stmt.where(Job.queue == queue)
+    if parent_id is not None:
+        stmt = stmt.where(Job.parent_id == parent_id)
+    if created_after is not None:
+        stmt = stmt.where(Job.created_at >= created_after)
+    if created_before is not None:
+        stmt = stmt.where(Job.created_at < created_before)
+    if updated_after is not None:
+        stmt = stmt.where(Job.updated_at >= updated_after)
+    if updated_before is not None:
+        stmt = stmt.where(Job.updated_at < updated_before)
+    if cursor is not None:
+        after_created_at, after_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(Job.created_at, Job.id)
+            < tuple_(literal(after_created_at, Job.created_at.type), literal(after_id, Job.id.type))
+        )
+
+    # one extra row tells whether there is a next page
+    stmt = stmt.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit + 1)
+    rows = (await db.execute(stmt)).mappings().all()
+
+    items = []
+    for row in rows[:limit]:
+        item = {name: row[name] for name in selected}
+        if "status" in item:
+            item["status"] = item["status"].value
+        items.append(item)
+    next_cursor = encode_cursor(rows[limit - 1]["created_at"], rows[limit - 1]["id"]) if len(rows) > limit else None
+
+    API_REQUEST_DURATION_SECONDS.labels(method="GET", path="/jobs").observe(
+        time.perf_counter() - start
+    )
+    return json_response({"items": items, "next_cursor": next_cursor})
+
+def encode_cursor(created_at: datetime, job_id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps([created_at, job_id])).decode("ascii")
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        created_at, job_id = orjson.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), uuid.UUID(job_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=422, detail="Invalid cursor") from None
+
 @router.get("/jobs/{job_id}", response_model=JobOut)
-async def get_job(job_id: str, db: AsyncSession = Depends(get_db)):
+async def get_job(
+        job_id: str,
+        fields: str | None = Query(
+            default=None,
+            description="Comma-separated subset of fields to return, e.g. status,attempts",
+        ),
+        db: AsyncSession = Depends(get_db),
+):
     start = time.perf_counter()
-    res = await db.execute(select(Job).where(Job.id == job_id))
-    job = res.scalar_one_or_none()
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
+    selected = parse_fields(fields) if fields else JOB_FIELDS
+    job = await job_fields(db, job_id, selected)
     JOB_GET_TOTAL.inc()
     API_REQUEST_DURATION_SECONDS.labels(method="GET", path="/jobs/{id}").observe(
         time.perf_counter() - start
     )
-    return job
+    return json_response(job)
 
-@router.get("/jobs/{job_id}/result")
-async def get_job_result(job_id: str, db: AsyncSession = Depends(get_db)):
-    start = time.perf_counter()
+def parse_fields(fields: str) -> tuple[str, ...]:
+    selected = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in selected if name not in JOB_FIELDS]
+    if unknown or not selected:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown)}; allowed: {', '.join(JOB_FIELDS)}")
+    return selected
+
+async def job_fields(db: AsyncSession, job_id: str, fields: tuple[str, ...]) -> dict:
+    """
+    The given columns of one job as a dict: a Core query of just those columns,
+    no ORM object and no re-validation, so a status check never decodes payload or result.
+    Finished jobs are cached (see job_cache) with whatever columns have been read so far.
+    """
+    cached = await job_cache.get(job_id)
+    if cached is not None and all(name in cached for name in fields):
+        return {name: cached[name] for name in fields}
 
-    res = await db.execute(select(Job).where(Job.id == job_id))
-    job = res.scalar_one_or_none()
-    if not job:
+    wanted = tuple(dict.fromkeys(("status", *fields)))
+    res = await db.execute(select(*(Job.__table__.c[name] for name in wanted)).where(Job.id == job_id))
+    row = res.mappings().one_or_none()
+    if row is None:
+        # finished long ago: retention may have moved it to the archive
+        res = await db.execute(
+            select(*(jobs_archive.c[name] for name in wanted)).where(jobs_archive.c.id == job_id)
+        )
+        row = res.mappings().one_or_none()
+    if row is None:
         raise HTTPException(status_code=404, detail="Job not found")
 
+    job = dict(row)
+    job["status"] = job["status"].value
+    if job["status"] in FINAL_STATUSES:
+        await job_cache.set(job_id, {**(cached or {}), **job})
+    return {name: job[name] for name in fields}
+
+async def read_job_status(job_id: str) -> str | None:
+    # own short session: a stream must not hold a pooled connection between reads
+    async with AsyncSessionLocal() as db:
+        status = await db.scalar(select(Job.status).where(Job.id == job_id))
+        if status is None:
+            # archived by retention, as in job_fields()
+            status = await db.scalar(select(jobs_archive.c.status).where(jobs_archive.c.id == job_id))
+    return status.value if status is not None else None
+
+@router.get("/jobs/{job_id}/result", response_model=JobResultOut)
+async def get_job_result(
+        job_id: str,
+        wait: str | None = Query(
+            default=None,
+            pattern=r"^\d+(\.\d+)?s?$",
+            description="Long-poll: hold the request up to this long (e.g. 30s) until the job finishes",
+        ),
+        db: AsyncSession = Depends(get_db),
+):
+    start = time.perf_counter()
+    wait_seconds = min(float(wait.removesuffix("s")), settings.result_wait_max_seconds) if wait else 0.0
+
+    # subscribe before the first read, so a completion in between is not missed
+    with subscribe(job_id.lower()) if wait_seconds else contextlib.nullcontext() as events:
+        job = await job_fields(db, job_id, RESULT_FIELDS)
+        if wait_seconds and job["status"] not in FINAL_STATUSES:
+            # Concept: give the connection back to the pool while waiting, not per poll
+            await db.rollback()
+            await wait_for_final_status(events, wait_seconds)
+            job = await job_fields(db, job_id, RESULT_FIELDS)
+
     API_REQUEST_DURATION_SECONDS.labels(method="GET", path="/jobs/{id}/result").observe(
         time.perf_counter() - start
     )
 
-    payload = JobResultOut(
-        id=job.id,
-        status=job.status.value,
-        result=job.result if job.status == JobStatus.succeeded else None,
-        error=job.error if job.status == JobStatus.failed else None,
-        last_error=job.last_error,
-        last_error_at=job.last_error_at,
-        failed_at=job.failed_at,
-        succeeded_at=job.succeeded_at,
-    )
+    status = job["status"]
+    payload = {
+        "id": job["id"],
+        "status": status,
+        "result": job["result"] if status == JobStatus.succeeded else None,
+        "error": job["error"] if status == JobStatus.failed else None,
+        "last_error": job["last_error"],
+        "last_error_at": job["last_error_at"],
+        "failed_at": job["failed_at"],
+        "succeeded_at": job["succeeded_at"],
+    }
 
-    if job.status in (JobStatus.queued, JobStatus.running):
+    if status in (JobStatus.queued, JobStatus.running):
         now = datetime.now(timezone.utc)
-        if job.run_after:
-            delta = (job.run_after - now).total_seconds()
+        if job["run_after"]:
+            delta = (job["run_after"] - now).total_seconds()
             retry_after_seconds = str(max(1, int(delta + 0.999)))  # ceil-ish
         else:
             retry_after_seconds = "1"
-        return JSONResponse(
+        return json_response(
+            payload,
             status_code=202,
-            content=jsonable_encoder(payload),
             headers={
                 "Retry-After": str(retry_after_seconds),
                 "Cache-Control": "no-store",
             },
         )
 
-    return JSONResponse(status_code=200, content=jsonable_encoder(payload))
+    if status == JobStatus.succeeded and job["result_ref"] is not None:
+        if not result_path(job["result_ref"]).exists():
+            raise HTTPException(status_code=500, detail="Job result is missing from the result store")
+        del payload["result"]
+        # the request's session stays open until the stream ends: end its transaction first
+        await db.rollback()
+        # Concept: offloaded results are streamed from the store, never loaded whole
+        return StreamingResponse(
+            stream_result(job["result_ref"], payload),
+            status_code=200,
+            media_type="application/json",
+        )
+
+    return json_response(payload)
+
+@router.get("/jobs/{job_id}/events")
+async def get_job_events(job_id: str):
+    """
+    Server-sent events: the job's status now, then each change, until it succeeds or fails.
+    """
+    # own short session, not get_db: that one would stay open, idle in transaction, as long as the stream
+    async with AsyncSessionLocal() as db:
+        await job_fields(db, job_id, ("id",))
+    return StreamingResponse(
+        job_status_stream(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
+async def job_status_stream(job_id: str) -> AsyncIterator[str]:
+    with subscribe(job_id.lower()) as events:
+        last = None
+        status = await read_job_status(job_id)
+        while status is not None:
+            if status != last:
+                yield f"event: status\ndata: {json.dumps({'id': job_id, 'status': status})}\n\n"
+                last = status
+            else:
+                yield ": keep-alive\n\n"
+            if status in FINAL_STATUSES:
+                return
+            try:
+                event = await asyncio.wait_for(events.get(), timeout=settings.events_keepalive_seconds)
+                status = event.get("status", status)
+            except asyncio.TimeoutError:
+                # also catches an event missed while the listener was reconnecting
+                status = await read_job_status(job_id)
 
 @router.get("/metrics")
 async def metrics():
@@ -0,0 +1,101 @@
+import logging
+import os
+import time
+from collections import OrderedDict
+
+import orjson
+
+from app.core.config import settings
+from app.core.metrics import API_JOB_CACHE_EVICTIONS_TOTAL, API_JOB_CACHE_LOOKUPS_TOTAL
+from app.core.queue import redis
+
+log = logging.getLogger("api.cache")
+
+# shared cache entries; workers delete them on every status change (see worker.core.redis)
+JOB_CACHE_PREFIX = os.getenv("JOB_CACHE_PREFIX", "jobrunner:job:")
+
+
+class LRUCache:
+    """
+    In-process LRU with a TTL per entry. Not thread-safe: only used from the event loop.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def get(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires <= time.monotonic():
+            del self._entries[key]
+            API_JOB_CACHE_EVICTIONS_TOTAL.labels(reason="expired").inc()
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: dict) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            API_JOB_CACHE_EVICTIONS_TOTAL.labels(reason="size").inc()
+
+    def invalidate(self, key: str) -> None:
+        if self._entries.pop(key, None) is not None:
+            API_JOB_CACHE_EVICTIONS_TOTAL.labels(reason="invalidated").inc()
+
+
+class JobCache:
+    """
+    Read-through cache of job columns (dicts as read by the API), only for succeeded/failed jobs:
+    those never change again, so polling them needs no database round trip.
+    Local LRU first, then the optional shared Redis cache, then the caller reads Postgres.
+    """
+
+    def __init__(self) -> None:
+        self.local = LRUCache(settings.job_cache_max_entries, settings.job_cache_ttl_seconds)
+
+    async def get(self, job_id: str) -> dict | None:
+        key = job_id.lower()
+        value = self.local.get(key)
+        if value is not None:
+            API_JOB_CACHE_LOOKUPS_TOTAL.labels(layer="local", outcome="hit").inc()
+            return value
+        API_JOB_CACHE_LOOKUPS_TOTAL.labels(layer="local", outcome="miss").inc()
+
+        if not settings.job_cache_redis_enabled:
+            return None
+        try:
+            raw = await redis.get(JOB_CACHE_PREFIX + key)
+        except Exception:
+            # the cache is an optimization: fall through to the database
+            log.exception("job_cache_redis_get_failed")
+            return None
+        if raw is None:
+            API_JOB_CACHE_LOOKUPS_TOTAL.labels(layer="redis", outcome="miss").inc()
+            return None
+        API_JOB_CACHE_LOOKUPS_TOTAL.labels(layer="redis", outcome="hit").inc()
+        value = orjson.loads(raw)
+        self.local.set(key, value)
+        return value
+
+    async def set(self, job_id: str, value: dict) -> None:
+        key = job_id.lower()
+        self.local.set(key, value)
+        if not settings.job_cache_redis_enabled:
+            return
+        try:
+            await redis.set(JOB_CACHE_PREFIX + key, orjson.dumps(value), ex=int(settings.job_cache_ttl_seconds))
+        except Exception:
+            log.exception("job_cache_redis_set_failed")
+
+    def invalidate(self, job_id: str) -> None:
+        # the shared copy is deleted by the worker that changed the job
+        self.local.invalidate(job_id.lower())
+
+
+job_cache = JobCache()
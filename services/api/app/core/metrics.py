@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 JOB_CREATED_TOTAL = Counter(
     "job_created_total",
@@ -15,4 +15,27 @@ API_REQUEST_DURATION_SECONDS = Histogram(
     "api_request_duration_seconds",
     "API request duration in seconds",
     ["method", "path"]
-)
\ No newline at end of file
+)
+
+API_JOB_EVENT_WAITERS = Gauge(
+    "api_job_event_waiters",
+    "Requests currently waiting on job status events (long-poll and SSE)",
+)
+
+API_JOB_CACHE_LOOKUPS_TOTAL = Counter(
+    "api_job_cache_lookups_total",
+    "Job cache lookups by layer (local, redis) and outcome (hit, miss)",
+    ["layer", "outcome"]
+)
+
+API_JOB_CACHE_EVICTIONS_TOTAL = Counter(
+    "api_job_cache_evictions_total",
+    "Entries removed from the in-process job cache, by reason (size, expired, invalidated)",
+    ["reason"]
+)
+
+API_JOB_ENQUEUE_SECONDS = Histogram(
+    "api_job_enqueue_seconds",
+    "Time from a job's commit (its outbox row) to its push onto the queue by the outbox relay",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
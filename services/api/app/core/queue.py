@@ -1,11 +1,52 @@
 import os
 from redis.asyncio import Redis
+from sqlalchemy import String, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
 QUEUE_NAME = os.getenv("QUEUE_NAME", "jobrunner:queue")
+STREAM_NAME = os.getenv("STREAM_NAME", "jobrunner:stream")
+DEFAULT_QUEUE = "default"
+# postgres queue backend: NOTIFY channels, same names in the worker (worker.backends.postgres_backend)
+JOBS_CHANNEL = os.getenv("JOBS_CHANNEL", "jobrunner_jobs")
+EVENTS_CHANNEL = os.getenv("EVENTS_CHANNEL", "jobrunner_events")
 
 redis = Redis.from_url(REDIS_URL, decode_responses=True)
 
-async def enqueue_job(job_id: str) -> None:
+def queue_key(queue: str) -> str:
+    # the default queue keeps the original key, so existing deployments keep working
+    return QUEUE_NAME if queue == DEFAULT_QUEUE else f"{QUEUE_NAME}:{queue}"
+
+def stream_key(queue: str) -> str:
+    # streams queue backend, same naming as the lists
+    return STREAM_NAME if queue == DEFAULT_QUEUE else f"{STREAM_NAME}:{queue}"
+
+async def enqueue_job(job_id: str, queue: str = DEFAULT_QUEUE) -> None:
     # add job id to the queue list
-    await redis.lpush(QUEUE_NAME, job_id)
\ No newline at end of file
+    await redis.lpush(queue_key(queue), job_id)
+
+async def enqueue_jobs(by_queue: dict[str, list[str]]) -> None:
+    # one LPUSH with many values per queue (or one XADD per id), all in one pipeline;
+    # the first id of each list is still the first one out
+    async with redis.pipeline(transaction=False) as pipe:
+        for queue, job_ids in by_queue.items():
+            if not job_ids:
+                continue
+            if settings.queue_backend == "streams":
+                for job_id in job_ids:
+                    pipe.xadd(stream_key(queue), {"job_id": job_id})
+            else:
+                pipe.lpush(queue_key(queue), *job_ids)
+        await pipe.execute()
+
+_notify_jobs = text("SELECT pg_notify(:channel, queue) FROM unnest(:queues) AS queue").bindparams(
+    bindparam("queues", type_=ARRAY(String))
+)
+
+async def notify_jobs(db: AsyncSession, queues: set[str]) -> None:
+    # postgres queue backend: NOTIFY is transactional, so workers wake only once the jobs are committed
+    if queues:
+        await db.execute(_notify_jobs, {"channel": JOBS_CHANNEL, "queues": sorted(queues)})
@@ -0,0 +1,30 @@
+import gzip
+from pathlib import Path
+from typing import Iterator
+
+import orjson
+
+from app.core.config import settings
+
+REF_PREFIX = "sha256:"
+# bytes of decompressed JSON per streamed chunk
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def result_path(ref: str) -> Path:
+    # same layout as the worker's writer (worker.core.results)
+    digest = ref.removeprefix(REF_PREFIX)
+    return Path(settings.result_store_dir) / digest[:2] / f"{digest}.json.gz"
+
+
+def stream_result(ref: str, envelope: dict) -> Iterator[bytes]:
+    """
+    The response body {"result": <stored result>, **envelope}, decompressed chunk by chunk,
+    so a large result never sits in memory as a whole.
+    """
+    yield b'{"result":'
+    with gzip.open(result_path(ref), "rb") as f:
+        while chunk := f.read(STREAM_CHUNK_BYTES):
+            yield chunk
+    # envelope always has at least the id: splice its members in after the result
+    yield b"," + orjson.dumps(envelope)[1:]
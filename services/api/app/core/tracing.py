@@ -0,0 +1,72 @@
+import logging
+
+from fastapi import FastAPI
+
+from app.core.config import settings
+
+try:
+    from opentelemetry import propagate, trace
+except ImportError:  # optional: pip install .[tracing]
+    trace = None
+
+log = logging.getLogger("api.tracing")
+
+_enabled = False
+
+
+def setup_tracing(app: FastAPI | None = None) -> None:
+    """
+    Exports spans when settings.tracing_exporter is set:
+    - otlp: to a collector, configured by the standard OTEL_EXPORTER_OTLP_* variables
+    - file: one JSON span per line, appended to settings.tracing_file_path
+    Requests (FastAPI), SQL (SQLAlchemy) and Redis calls get spans; new jobs carry the
+    request's trace context (see current_trace_context), so their worker spans join its trace.
+    """
+    global _enabled
+    if settings.tracing_exporter == "none":
+        return
+    try:
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+        from opentelemetry.instrumentation.redis import RedisInstrumentor
+        from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as e:
+        raise RuntimeError("TRACING_EXPORTER is set but OpenTelemetry is not installed (pip install .[tracing])") from e
+
+    from app.db.session import engine
+
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.app_name}))
+    provider.add_span_processor(BatchSpanProcessor(make_exporter()))
+    trace.set_tracer_provider(provider)
+    SQLAlchemyInstrumentor().instrument(engine=engine.sync_engine)
+    RedisInstrumentor().instrument()
+    if app is not None:
+        FastAPIInstrumentor.instrument_app(app, excluded_urls="metrics")
+
+    _enabled = True
+    log.info("tracing_enabled", extra={"exporter": settings.tracing_exporter})
+
+
+def make_exporter():
+    if settings.tracing_exporter == "file":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        out = open(settings.tracing_file_path, "a", encoding="utf-8")
+        return ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+    return OTLPSpanExporter()
+
+
+def current_trace_context() -> dict | None:
+    """
+    The current span as a W3C carrier ({"traceparent": ..., "tracestate": ...}), stored on new jobs.
+    """
+    if not _enabled:
+        return None
+    carrier: dict[str, str] = {}
+    propagate.inject(carrier)
+    return carrier or None
@@ -1,10 +1,13 @@
+import orjson
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
 
 engine: AsyncEngine = create_async_engine(
     settings.database_url,
-    pool_pre_ping=True
+    pool_pre_ping=True,
+    # JSON columns (payload, result) are the bulk of a job row: parse them with orjson
+    json_deserializer=orjson.loads,
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -0,0 +1,118 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+from typing import Iterator
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.core.cache import job_cache
+from app.core.config import settings
+from app.core.metrics import API_JOB_EVENT_WAITERS
+from app.core.queue import EVENTS_CHANNEL, redis
+
+log = logging.getLogger("api.events")
+
+# workers publish {"job_id", "status"} here after each commit that changes a job's status
+EVENTS_NAME = os.getenv("EVENTS_NAME", "jobrunner:events")
+
+# job_id -> queues of the requests waiting on that job in this process
+_waiters: dict[str, set[asyncio.Queue]] = {}
+
+
+@contextlib.contextmanager
+def subscribe(job_id: str) -> Iterator[asyncio.Queue]:
+    """
+    Status events of one job, from the process-wide subscription (see listen_job_events).
+    Subscribe before reading the job's row, so an event can't slip in between.
+    """
+    events: asyncio.Queue = asyncio.Queue()
+    _waiters.setdefault(job_id, set()).add(events)
+    API_JOB_EVENT_WAITERS.inc()
+    try:
+        yield events
+    finally:
+        API_JOB_EVENT_WAITERS.dec()
+        waiters = _waiters.get(job_id)
+        if waiters is not None:
+            waiters.discard(events)
+            if not waiters:
+                del _waiters[job_id]
+
+
+def dispatch(message: str) -> None:
+    try:
+        event = json.loads(message)
+        job_id = event["job_id"]
+    except (ValueError, KeyError, TypeError):
+        log.warning("bad_job_event", extra={"event": message})
+        return
+    # a status change makes any cached snapshot of the job stale
+    job_cache.invalidate(job_id)
+    for events in _waiters.get(job_id, ()):
+        events.put_nowait(event)
+
+
+async def listen_job_events() -> None:
+    """
+    One subscription per API process (Redis pub/sub, or LISTEN with the postgres queue backend),
+    fanned out in memory to every waiting request.
+    Events are not replayed after a reconnect: waiters fall back to their own timeouts.
+    """
+    if settings.queue_backend == "postgres":
+        await listen_postgres_job_events()
+        return
+
+    while True:
+        try:
+            async with redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                await pubsub.subscribe(EVENTS_NAME)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        dispatch(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception("job_events_listener_failed")
+            await asyncio.sleep(1)
+
+
+async def listen_postgres_job_events() -> None:
+    dsn = make_url(settings.database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+    while True:
+        try:
+            conn = await asyncpg.connect(dsn)
+            try:
+                await conn.add_listener(EVENTS_CHANNEL, lambda _conn, _pid, _channel, payload: dispatch(payload))
+                while True:
+                    await asyncio.sleep(settings.events_keepalive_seconds)
+                    # a dead connection would otherwise go unnoticed: it just never notifies
+                    await conn.execute("SELECT 1")
+            finally:
+                await conn.close()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception("job_events_listener_failed")
+            await asyncio.sleep(1)
+
+
+FINAL_STATUSES = ("succeeded", "failed")
+
+
+async def wait_for_final_status(events: asyncio.Queue, timeout: float) -> str | None:
+    """
+    Waits up to timeout for a succeeded/failed event; retries (queued again) keep waiting.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while (remaining := deadline - loop.time()) > 0:
+        try:
+            event = await asyncio.wait_for(events.get(), timeout=remaining)
+        except asyncio.TimeoutError:
+            return None
+        if event.get("status") in FINAL_STATUSES:
+            return event["status"]
+    return None
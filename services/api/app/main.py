@@ -1,7 +1,29 @@
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from app.api.routes import router
+from app.core.config import settings
+from app.core.tracing import setup_tracing
+from app.events import listen_job_events
+from app.relay import relay_outbox
 from prometheus_fastapi_instrumentator import Instrumentator
 
-app = FastAPI(title="jobrunner-api")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    relay_enabled = settings.outbox_relay_in_api and settings.queue_backend != "postgres"
+    relay = asyncio.create_task(relay_outbox()) if relay_enabled else None
+    events = asyncio.create_task(listen_job_events())
+    yield
+    for task in (relay, events):
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+app = FastAPI(title="jobrunner-api", lifespan=lifespan)
+setup_tracing(app)
 Instrumentator().instrument(app).expose(app, endpoint="/metrics")
-app.include_router(router)
\ No newline at end of file
+app.include_router(router)
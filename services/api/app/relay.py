@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.core.metrics import API_JOB_ENQUEUE_SECONDS
+from app.core.queue import enqueue_jobs
+from app.core.tracing import setup_tracing
+from app.db.session import AsyncSessionLocal
+from app.models.outbox import OutboxEntry
+
+log = logging.getLogger("api.relay")
+
+# set right after a commit that wrote outbox rows, so this process relays without waiting
+outbox_wakeup = asyncio.Event()
+
+
+def notify_outbox() -> None:
+    outbox_wakeup.set()
+
+
+async def relay_batch(limit: int) -> int:
+    """
+    Moves up to limit outbox rows to the queue. Returns how many were moved.
+    Rows are deleted and pushed in one transaction that commits after the push:
+    a crash in between re-sends them (at least once), it never drops them.
+    SKIP LOCKED lets several relays drain the outbox side by side.
+    """
+    async with AsyncSessionLocal() as db:
+        async with db.begin():
+            picked = (
+                select(OutboxEntry.id)
+                .order_by(OutboxEntry.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            res = await db.execute(
+                delete(OutboxEntry)
+                .where(OutboxEntry.id.in_(picked))
+                .returning(OutboxEntry.id, OutboxEntry.job_id, OutboxEntry.queue, OutboxEntry.created_at)
+            )
+            rows = sorted(res.all())  # RETURNING order is not guaranteed
+
+            by_queue: dict[str, list[str]] = {}
+            for row in rows:
+                by_queue.setdefault(row.queue, []).append(str(row.job_id))
+            await enqueue_jobs(by_queue)
+
+            pushed = time.time()
+            for row in rows:
+                API_JOB_ENQUEUE_SECONDS.observe(max(0.0, pushed - row.created_at.timestamp()))
+    return len(rows)
+
+
+async def relay_outbox() -> None:
+    """
+    Outbox relay loop: drains in batches, then waits for a local wakeup
+    or the poll interval (commits made by other API processes).
+    """
+    while True:
+        outbox_wakeup.clear()
+        try:
+            moved = await relay_batch(settings.outbox_batch_size)
+        except Exception:
+            log.exception("outbox_relay_failed")
+            moved = 0
+
+        # a full batch means there is probably more waiting
+        if moved < settings.outbox_batch_size:
+            try:
+                await asyncio.wait_for(outbox_wakeup.wait(), timeout=settings.outbox_poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+
+def main() -> None:
+    """
+    Standalone relay, for running it as its own service instead of inside the API.
+    """
+    logging.basicConfig(level=logging.INFO)
+    setup_tracing()
+    asyncio.run(relay_outbox())
+
+
+if __name__ == "__main__":
+    main()
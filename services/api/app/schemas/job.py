@@ -4,15 +4,37 @@ from pydantic import BaseModel, Field
 
 class JobCreate(BaseModel):
     type: str = Field(min_length=1, max_length=50)
+    # named queue; workers choose which queues they serve and how they weigh them
+    queue: str = Field(default="default", min_length=1, max_length=50, pattern=r"^[A-Za-z0-9_.-]+$")
     payload: dict = Field(default_factory=dict)
     result: dict | None = None
 
+class JobBatchItem(JobCreate):
+    idempotency_key: str | None = Field(default=None, min_length=1, max_length=128)
+
+class JobBatchItemOut(BaseModel):
+    """
+    per-item outcome of POST /jobs:batch
+    """
+    index: int
+    id: uuid.UUID
+    status: str
+    created: bool
+    idempotency_key: str | None = None
+
+class JobBatchOut(BaseModel):
+    items: list[JobBatchItemOut]
+
 class JobOut(BaseModel):
     id: uuid.UUID
     type: str
+    queue: str
+    parent_id: uuid.UUID | None = None
     payload: dict
     status: str
     result: dict | None = None
+    # large results are not inline: result is null and they are served by GET /jobs/{id}/result
+    result_ref: str | None = None
     error: str | None = None
 
     # lifecycle timestamps
@@ -37,6 +59,14 @@ class JobOut(BaseModel):
     class Config:
         from_attributes = True
 
+class JobListOut(BaseModel):
+    """
+    from GET /jobs: items carry the requested fields only (see JobOut)
+    """
+    items: list[dict]
+    # pass as ?cursor= for the next page; null on the last page
+    next_cursor: str | None = None
+
 class JobResultOut(BaseModel):
     """
     from GET /jobs/{id}/result
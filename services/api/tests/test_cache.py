@@ -0,0 +1,74 @@
+import pytest
+
+import app.core.cache as cache
+from app.core.cache import LRUCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+def test_get_returns_what_was_set(clock):
+    lru = LRUCache(max_entries=2, ttl_seconds=10)
+    lru.set("a", {"status": "succeeded"})
+    assert lru.get("a") == {"status": "succeeded"}
+    assert lru.get("b") is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    lru = LRUCache(max_entries=2, ttl_seconds=10)
+    lru.set("a", {"n": 1})
+    lru.set("b", {"n": 2})
+    lru.get("a")  # b is now the least recently used
+    lru.set("c", {"n": 3})
+    assert lru.get("b") is None
+    assert lru.get("a") == {"n": 1}
+    assert lru.get("c") == {"n": 3}
+
+
+def test_set_refreshes_an_existing_entry(clock):
+    lru = LRUCache(max_entries=2, ttl_seconds=10)
+    lru.set("a", {"n": 1})
+    lru.set("b", {"n": 2})
+    lru.set("a", {"n": 3})
+    lru.set("c", {"n": 4})
+    assert lru.get("a") == {"n": 3}
+    assert lru.get("b") is None
+
+
+def test_entries_expire_after_the_ttl(clock):
+    lru = LRUCache(max_entries=2, ttl_seconds=10)
+    lru.set("a", {"n": 1})
+    clock.now += 9.9
+    assert lru.get("a") == {"n": 1}
+    clock.now += 0.1
+    assert lru.get("a") is None
+    assert "a" not in lru._entries
+
+
+def test_get_does_not_extend_the_ttl(clock):
+    lru = LRUCache(max_entries=2, ttl_seconds=10)
+    lru.set("a", {"n": 1})
+    clock.now += 5
+    lru.get("a")
+    clock.now += 5
+    assert lru.get("a") is None
+
+
+def test_invalidate(clock):
+    lru = LRUCache(max_entries=2, ttl_seconds=10)
+    lru.set("a", {"n": 1})
+    lru.invalidate("a")
+    lru.invalidate("missing")
+    assert lru.get("a") is None
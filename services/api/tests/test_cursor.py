@@ -0,0 +1,44 @@
+import base64
+import uuid
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+from fastapi import HTTPException
+
+from app.api.routes import decode_cursor, encode_cursor
+
+
+def test_round_trip():
+    created_at = datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    job_id = uuid.uuid4()
+    assert decode_cursor(encode_cursor(created_at, job_id)) == (created_at, job_id)
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(datetime.now(timezone.utc), uuid.uuid4())
+    assert set(cursor) <= set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_=")
+
+
+def b64(value) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps(value)).decode("ascii")
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "not base64!",
+        "é",
+        base64.urlsafe_b64encode(b"not json").decode("ascii"),
+        b64({"created_at": "2026-03-01T12:00:00+00:00"}),
+        b64(["2026-03-01T12:00:00+00:00"]),
+        b64(["yesterday", str(uuid.uuid4())]),
+        b64(["2026-03-01T12:00:00+00:00", "not-a-uuid"]),
+        b64([1, 2]),
+    ],
+)
+def test_invalid_cursor_is_a_422(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 422
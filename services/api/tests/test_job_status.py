@@ -0,0 +1,66 @@
+import asyncio
+import contextlib
+import uuid
+
+import pytest
+
+import app.api.routes as routes
+from app.models.job import JobStatus
+
+
+class FakeSession:
+    """Answers scalar queries from jobs or jobs_archive, whichever the statement reads."""
+
+    def __init__(self, jobs: dict, archive: dict) -> None:
+        self.tables = {"jobs": jobs, "jobs_archive": archive}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def scalar(self, stmt):
+        (table,) = {t.name for t in stmt.get_final_froms()}
+        job_id = stmt.whereclause.right.value
+        return self.tables[table].get(job_id)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    jobs: dict = {}
+    archive: dict = {}
+    monkeypatch.setattr(routes, "AsyncSessionLocal", lambda: FakeSession(jobs, archive))
+    return jobs, archive
+
+
+def test_status_of_a_live_job(db):
+    jobs, _ = db
+    job_id = str(uuid.uuid4())
+    jobs[job_id] = JobStatus.running
+    assert asyncio.run(routes.read_job_status(job_id)) == "running"
+
+
+def test_status_falls_back_to_the_archive(db):
+    _, archive = db
+    job_id = str(uuid.uuid4())
+    archive[job_id] = JobStatus.succeeded
+    assert asyncio.run(routes.read_job_status(job_id)) == "succeeded"
+
+
+def test_unknown_job_has_no_status(db):
+    assert asyncio.run(routes.read_job_status(str(uuid.uuid4()))) is None
+
+
+def test_stream_of_an_archived_job_ends_with_its_final_status(db, monkeypatch):
+    _, archive = db
+    job_id = str(uuid.uuid4())
+    archive[job_id] = JobStatus.failed
+    monkeypatch.setattr(routes, "subscribe", lambda _job_id: contextlib.nullcontext())
+
+    async def collect():
+        return [event async for event in routes.job_status_stream(job_id)]
+
+    events = asyncio.run(collect())
+    assert len(events) == 1
+    assert '"status": "failed"' in events[0]
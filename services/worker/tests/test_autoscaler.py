@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+
+import worker.autoscaler as autoscaler
+from worker.autoscaler import ConcurrencyController
+from worker.core.config import settings
+from worker.core.queues import queue_set_key
+from worker.core.slots import Slots
+
+
+@pytest.fixture(autouse=True)
+def autoscale_settings(monkeypatch):
+    monkeypatch.setattr(settings, "autoscale_min_concurrency", 1)
+    monkeypatch.setattr(settings, "autoscale_max_concurrency", 8)
+    monkeypatch.setattr(settings, "autoscale_target_wait_seconds", 4.0)
+    monkeypatch.setattr(settings, "autoscale_scale_down_delay_seconds", 60.0)
+
+
+def controller(limit: int) -> ConcurrencyController:
+    return ConcurrencyController(Slots(limit))
+
+
+def test_scales_up_at_once():
+    c = controller(2)
+    assert c.decide(5, 0.0, now=0.0) == 5
+
+
+def test_scale_up_is_clamped_to_max():
+    c = controller(2)
+    assert c.decide(100, 0.0, now=0.0) == 8
+
+
+def test_wait_over_target_adds_one_slot():
+    c = controller(3)
+    # the estimate says 2 are enough, the queue says otherwise
+    assert c.decide(2, 5.0, now=0.0) == 4
+    assert c.decide(2, 5.0, now=10.0) == 5
+
+
+def test_wait_over_target_stops_at_max():
+    c = controller(8)
+    assert c.decide(8, 5.0, now=0.0) == 8
+
+
+def test_scale_down_waits_for_the_delay():
+    c = controller(6)
+    assert c.decide(2, 0.0, now=0.0) == 6
+    assert c.decide(2, 0.0, now=59.0) == 6
+    assert c.decide(2, 0.0, now=60.0) == 2
+
+
+def test_scale_down_is_clamped_to_min():
+    c = controller(4)
+    c.decide(0, 0.0, now=0.0)
+    assert c.decide(0, 0.0, now=60.0) == 1
+
+
+def test_higher_target_restarts_the_delay():
+    c = controller(6)
+    c.decide(2, 0.0, now=0.0)
+    c.decide(6, 0.0, now=30.0)
+    assert c.decide(2, 0.0, now=60.0) == 6
+    assert c.decide(2, 0.0, now=120.0) == 2
+
+
+def test_no_scale_down_while_jobs_wait_over_half_the_target():
+    c = controller(6)
+    c.decide(2, 3.0, now=0.0)
+    assert c.decide(2, 3.0, now=120.0) == 6
+    # the delay only starts once waits are short again
+    assert c.decide(2, 1.0, now=121.0) == 6
+    assert c.decide(2, 1.0, now=181.0) == 2
+
+
+class FakeBackend:
+    """Live workers per served queue set."""
+
+    def __init__(self, workers: dict[str, int | None]) -> None:
+        self.workers = workers
+
+    async def live_workers(self, queues):
+        return self.workers.get(queue_set_key(queues))
+
+
+@pytest.fixture
+def autoscale_once(monkeypatch):
+    """Runs one autoscaling round that needs 10 slots in all; returns this worker's target."""
+
+    async def read_queue_stats():
+        return {}
+
+    class FakeConn:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, *_args):
+            return []
+
+    class FakeEngine:
+        def connect(self):
+            return FakeConn()
+
+    class RecordingController:
+        target = None
+
+        def decide(self, target, oldest_wait, now):
+            self.target = target
+
+    monkeypatch.setattr(autoscaler, "read_queue_stats", read_queue_stats)
+    monkeypatch.setattr(autoscaler, "engine", FakeEngine())
+    monkeypatch.setattr(autoscaler, "required_slots", lambda *_args: 10.0)
+    monkeypatch.setattr(autoscaler, "_slot_seconds", {"noop": 1.0})
+
+    def run(queues: list[str], workers: dict[str, int | None]) -> int:
+        monkeypatch.setattr(autoscaler, "queue_backend", FakeBackend(workers))
+        controller = RecordingController()
+        asyncio.run(autoscaler.autoscale_once(controller, queues))
+        return controller.target
+
+    return run
+
+
+@pytest.mark.parametrize("workers, target", [(4, 3), (1, 10), (None, 10), (0, 10)])
+def test_target_is_an_even_split_across_live_workers(autoscale_once, workers, target):
+    assert autoscale_once(["default"], {"default": workers}) == target
+
+
+def test_only_workers_serving_the_same_queues_share_the_load(autoscale_once):
+    workers = {"default": 5, "bulk,default": 2, "bulk": 1}
+    assert autoscale_once(["default"], workers) == 2
+    # same set in another order
+    assert autoscale_once(["default", "bulk"], workers) == 5
+    assert autoscale_once(["bulk"], workers) == 10
+
+
+def test_queue_set_key_ignores_order_and_duplicates():
+    assert queue_set_key(["b", "a", "b"]) == queue_set_key(["a", "b"]) == "a,b"
@@ -0,0 +1,127 @@
+import io
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from worker.jobs.csv_stats import (
+    ColumnStats,
+    CsvSummary,
+    HyperLogLog,
+    hash_strings,
+    line_ranges,
+    read_header,
+    summarize_csv,
+    summarize_csv_range,
+)
+
+
+def column(values: list[str]) -> np.ndarray:
+    return np.array(values, dtype=object)
+
+
+def test_numeric_column_summary():
+    numbers = np.random.default_rng(1).normal(50, 10, 5000)
+    stats = ColumnStats()
+    stats.add_batch(column([repr(float(x)) for x in numbers] + ["", "NA"]))
+
+    summary = stats.summary()
+    assert summary["type"] == "numeric"
+    assert summary["count"] == 5000
+    assert summary["nulls"] == 2
+    assert summary["mean"] == pytest.approx(numbers.mean())
+    assert summary["stddev"] == pytest.approx(numbers.std(ddof=1))
+    assert summary["min"] == numbers.min()
+    assert summary["max"] == numbers.max()
+
+
+def test_column_turns_text_on_first_non_number():
+    stats = ColumnStats()
+    stats.add_batch(column(["1", "2"]))
+    stats.add_batch(column(["3", "abc"]))
+
+    summary = stats.summary()
+    assert summary["type"] == "text"
+    assert (summary["min"], summary["max"]) == ("1", "abc")
+
+
+def test_merged_moments_match_a_single_pass():
+    numbers = np.random.default_rng(2).exponential(3, 9000)
+    whole = ColumnStats()
+    whole.add_batch(column([repr(float(x)) for x in numbers]))
+
+    merged = ColumnStats()
+    for part in np.array_split(numbers, [10, 4000]):
+        stats = ColumnStats()
+        stats.add_batch(column([repr(float(x)) for x in part]))
+        merged.merge(ColumnStats.from_dict(stats.to_dict()))
+
+    assert merged.n == whole.n
+    assert merged.mean == pytest.approx(whole.mean)
+    assert merged.m2 == pytest.approx(whole.m2)
+    assert (merged.num_min, merged.num_max) == (whole.num_min, whole.num_max)
+
+
+def test_hash_strings_is_stable_and_distinguishes_values():
+    hashes = hash_strings(["a", "b", "a", "é" * 100])
+    assert hashes.dtype == np.uint64
+    assert hashes[0] == hashes[2]
+    assert len(set(hashes.tolist())) == 3
+    assert hash_strings([]).size == 0
+
+
+@pytest.mark.parametrize("distinct", [10, 1000, 100_000])
+def test_hyperloglog_estimate(distinct):
+    sketch = HyperLogLog()
+    sketch.add_hashes(hash_strings(str(i) for i in range(distinct)))
+    assert sketch.estimate() == pytest.approx(distinct, rel=0.03)
+
+
+def test_hyperloglog_merge_is_union_and_round_trips():
+    left, right = HyperLogLog(), HyperLogLog()
+    left.add_hashes(hash_strings(str(i) for i in range(0, 60_000)))
+    right.add_hashes(hash_strings(str(i) for i in range(40_000, 100_000)))
+
+    left.merge(HyperLogLog.from_text(right.to_text()))
+    assert left.estimate() == pytest.approx(100_000, rel=0.03)
+
+
+def test_ragged_rows_are_padded_and_truncated():
+    summary = CsvSummary(["a", "b"])
+    summary.add_rows([["1"], ["2", "x", "extra"]])
+
+    assert summary.rows == 2
+    assert summary.stats[0].count == 2
+    assert (summary.stats[1].count, summary.stats[1].nulls) == (1, 1)
+
+
+def test_one_long_cell_does_not_widen_the_chunk():
+    # a fixed-width unicode array would take rows * 200k * 4 bytes (about 4 GB) here
+    rows = [[str(i), "x"] for i in range(5000)]
+    rows[0][1] = "y" * 200_000
+
+    tracemalloc.start()
+    try:
+        summary = CsvSummary(["id", "text"])
+        summary.add_rows(rows)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak < 20 * 1024 * 1024
+    assert summary.stats[1].summary()["approx_distinct"] == 2
+
+
+def test_byte_ranges_add_up_to_the_whole_file():
+    lines = ["n,label"] + [f"{i},{'even' if i % 2 == 0 else 'odd'}" for i in range(1000)]
+    data = ("\n".join(lines) + "\n").encode()
+
+    whole = summarize_csv(io.StringIO(data.decode())).summary()
+
+    f = io.BytesIO(data)
+    columns, start = read_header(f)
+    merged = CsvSummary(columns)
+    for range_start, range_end in line_ranges(f, start, len(data), chunk_bytes=500):
+        merged.merge(summarize_csv_range(f, range_start, range_end, columns))
+
+    assert merged.summary() == whole
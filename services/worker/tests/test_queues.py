@@ -0,0 +1,59 @@
+from collections import Counter
+
+import pytest
+
+from worker.core.queues import QueueSelector, QueueWeight, parse_queues
+
+
+def test_parse_queues_keeps_order_and_weights():
+    assert parse_queues("interactive:10, default:3,bulk") == [
+        QueueWeight("interactive", 10),
+        QueueWeight("default", 3),
+        QueueWeight("bulk", 1),
+    ]
+
+
+def test_parse_queues_skips_empty_parts():
+    assert parse_queues("default,,") == [QueueWeight("default", 1)]
+
+
+@pytest.mark.parametrize("spec", ["", " , ", "default:0", "default:-1"])
+def test_parse_queues_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        parse_queues(spec)
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        QueueSelector(parse_queues("default"), "random")
+
+
+def test_strict_always_uses_the_configured_order():
+    selector = QueueSelector(parse_queues("a:5,b:1"), "strict")
+    assert all(selector.order() == ["a", "b"] for _ in range(10))
+
+
+def test_weighted_single_queue():
+    selector = QueueSelector(parse_queues("default:3"), "weighted")
+    assert selector.order() == ["default"]
+
+
+def test_weighted_first_picks_follow_the_weights():
+    selector = QueueSelector(parse_queues("a:5,b:3,c:2"), "weighted")
+    firsts = Counter(selector.order()[0] for _ in range(100))
+    assert firsts == {"a": 50, "b": 30, "c": 20}
+
+
+def test_weighted_picks_are_interleaved():
+    # smooth round-robin: the heavy queue is not picked five times in a row
+    selector = QueueSelector(parse_queues("a:5,b:1,c:1"), "weighted")
+    assert [selector.order()[0] for _ in range(7)] == ["a", "a", "b", "a", "c", "a", "a"]
+
+
+def test_weighted_order_tries_every_queue():
+    selector = QueueSelector(parse_queues("a:1,b:2,c:1"), "weighted")
+    for _ in range(8):
+        order = selector.order()
+        assert sorted(order) == ["a", "b", "c"]
+        # the rest follow in configured order
+        assert order[1:] == [name for name in ["a", "b", "c"] if name != order[0]]
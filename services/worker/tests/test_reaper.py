@@ -0,0 +1,63 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+import worker.reaper as reaper
+from worker.models.job import JobStatus
+
+
+@pytest.fixture
+def reap(monkeypatch):
+    """Runs reap_expired() against the given rows; returns (ids passed to the reset, lease actions)."""
+
+    def run(rows):
+        reset_asked: list[uuid.UUID] = []
+        actions: list[tuple[str, str, float]] = []
+
+        class FakeSession:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def execute(self, _stmt):
+                return rows
+
+        async def reset_abandoned_jobs(db, job_uuids, now):
+            reset_asked.extend(job_uuids)
+            return set(job_uuids)
+
+        async def release_expired_leases(now, queue_actions, queue):
+            actions.extend(queue_actions)
+
+        monkeypatch.setattr(reaper, "AsyncSessionLocal", FakeSession)
+        monkeypatch.setattr(reaper, "reset_abandoned_jobs", reset_abandoned_jobs)
+        monkeypatch.setattr(reaper, "release_expired_leases", release_expired_leases)
+        asyncio.run(reaper.reap_expired([str(row.id) for row in rows], 1000.0))
+        return reset_asked, actions
+
+    return run
+
+
+def running(fanned_out: bool) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(), queue="default", status=JobStatus.running, run_after=None, fanned_out=fanned_out
+    )
+
+
+def test_abandoned_job_is_reset_and_requeued(reap):
+    job = running(fanned_out=False)
+    reset_asked, actions = reap([job])
+    assert reset_asked == [job.id]
+    assert actions == [("requeue", str(job.id), 0)]
+
+
+def test_fanned_out_parent_is_never_run_again(reap):
+    # committed with its children, then the worker died before acking
+    parent = running(fanned_out=True)
+    reset_asked, actions = reap([parent])
+    assert reset_asked == []
+    assert actions == [("drop", str(parent.id), 0)]
@@ -0,0 +1,119 @@
+import asyncio
+import uuid
+
+import pytest
+
+import worker.main as main
+from worker.backends.redis_backend import RedisBackend
+from worker.models.job import Job, JobStatus
+
+
+class RecordingBackend:
+    def __init__(self) -> None:
+        self.acked: list[str] = []
+        self.released: list[str] = []
+        self.abandoned: list[str] = []
+
+    async def ack_job_ids(self, job_ids):
+        self.acked.extend(job_ids)
+
+    async def release_unclaimed_job_ids(self, job_ids):
+        self.released.extend(job_ids)
+
+    async def abandon_job_ids(self, job_ids):
+        self.abandoned.extend(job_ids)
+
+    async def schedule_retries(self, retries):
+        pass
+
+    async def enqueue_job_ids(self, job_ids_by_queue):
+        pass
+
+    async def publish_job_events(self, statuses):
+        pass
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def begin(self):
+        return _AsyncNull()
+
+
+class _AsyncNull:
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = RecordingBackend()
+    monkeypatch.setattr(main, "queue_backend", backend)
+    monkeypatch.setattr(main, "AsyncSessionLocal", FakeSession)
+    return backend
+
+
+def finished_job(job_id: str) -> Job:
+    return Job(id=uuid.UUID(job_id), type="noop", queue="default", status=JobStatus.succeeded, attempts=1)
+
+
+def test_unclaimed_duplicate_is_not_acked(backend, monkeypatch):
+    # another worker is running the job: this reservation came from a duplicate queue entry
+    async def not_claimed(db, job_id):
+        return [], []
+
+    monkeypatch.setattr(main, "process_job", not_claimed)
+    job_id = str(uuid.uuid4())
+
+    asyncio.run(main.run_reserved_jobs([job_id]))
+
+    assert backend.acked == []
+    assert backend.released == [job_id]
+
+
+def test_batch_acks_only_claimed_ids(backend, monkeypatch):
+    claimed_id, duplicate_id = str(uuid.uuid4()), str(uuid.uuid4())
+
+    async def claim_one(db, job_ids):
+        return [finished_job(claimed_id)], []
+
+    monkeypatch.setattr(main, "process_batch", claim_one)
+
+    asyncio.run(main.run_reserved_jobs([claimed_id, duplicate_id]))
+
+    assert backend.acked == [claimed_id]
+    assert backend.released == [duplicate_id]
+
+
+def test_redis_backend_keeps_lease_of_unclaimed_ids(monkeypatch):
+    # the lease is keyed by job id: removing it would drop the lease of the worker running the job
+    async def forbidden(job_ids):
+        raise AssertionError("unclaimed ids must not be removed from the lease set")
+
+    monkeypatch.setattr("worker.core.redis.ack_job_ids", forbidden)
+    asyncio.run(RedisBackend().release_unclaimed_job_ids([str(uuid.uuid4())]))
+
+
+def test_failed_batch_is_abandoned_not_acked(backend, monkeypatch):
+    async def crash(db, job_id):
+        raise RuntimeError("handler blew up")
+
+    async def no_sleep(_seconds):
+        pass
+
+    monkeypatch.setattr(main, "process_job", crash)
+    monkeypatch.setattr(main.asyncio, "sleep", no_sleep)
+    job_id = str(uuid.uuid4())
+
+    asyncio.run(main.run_reserved_jobs([job_id]))
+
+    assert backend.acked == []
+    assert backend.released == []
+    assert backend.abandoned == [job_id]
@@ -0,0 +1,63 @@
+import asyncio
+import uuid
+
+import pytest
+
+from worker.backends.streams_backend import StreamsBackend
+from worker.core import streams
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    """Fake stream: read_entries hands out the queued entries, ack_entries records what was acked."""
+    state = {"queued": [], "acked": []}
+
+    async def read_entries(queue, consumer, count, block_seconds=None):
+        entries, state["queued"] = state["queued"][:count], state["queued"][count:]
+        return entries
+
+    async def ack_entries(entries):
+        state["acked"].extend(entry_id for ids in entries.values() for entry_id in ids)
+
+    monkeypatch.setattr(streams, "read_entries", read_entries)
+    monkeypatch.setattr(streams, "ack_entries", ack_entries)
+    return state
+
+
+def reserve(backend: StreamsBackend) -> list[str]:
+    return asyncio.run(backend.reserve_job_ids(["default"], 1, 30.0, timeout_seconds=0))
+
+
+@pytest.fixture
+def backend() -> StreamsBackend:
+    backend = StreamsBackend()
+    backend._next_reclaim = float("inf")  # no stale entries to claim in these tests
+    return backend
+
+
+def test_releasing_a_duplicate_keeps_the_running_entry(backend, stream):
+    job_id = str(uuid.uuid4())
+    stream["queued"] = [("s", "1-0", job_id), ("s", "2-0", job_id)]
+    assert reserve(backend) == [job_id]  # slot 1, claims and runs the job
+    assert reserve(backend) == [job_id]  # slot 2, a duplicate entry: not claimed
+
+    asyncio.run(backend.release_unclaimed_job_ids([job_id]))
+
+    assert len(stream["acked"]) == 1
+    assert len(backend._delivered[job_id]) == 1  # still pending, still renewed
+
+    asyncio.run(backend.ack_job_ids([job_id]))
+    assert sorted(stream["acked"]) == ["1-0", "2-0"]
+    assert backend._delivered == {}
+
+
+def test_abandoned_entries_are_no_longer_renewed(backend, stream):
+    job_id = str(uuid.uuid4())
+    stream["queued"] = [("s", "1-0", job_id)]
+    reserve(backend)
+
+    asyncio.run(backend.abandon_job_ids([job_id]))
+
+    # not acked: the entry stays pending and is claimed again once idle for lease_seconds
+    assert stream["acked"] == []
+    assert backend._delivered == {}
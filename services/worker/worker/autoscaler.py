@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import math
+import time
+
+from sqlalchemy import String, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from worker.backends import queue_backend
+from worker.core.config import settings
+from worker.core.metrics import (
+    WORKER_AUTOSCALE_ARRIVAL_RATE,
+    WORKER_AUTOSCALE_DECISIONS_TOTAL,
+    WORKER_AUTOSCALE_DESIRED_REPLICAS,
+    WORKER_AUTOSCALE_EXECUTION_SECONDS,
+    WORKER_AUTOSCALE_TARGET_CONCURRENCY,
+    WORKER_CONCURRENCY_IN_USE,
+    WORKER_CONCURRENCY_LIMIT,
+)
+from worker.core.queues import parse_queues
+from worker.core.slots import Slots
+from worker.db.session import engine
+from worker.models.job import Job, JobStatus
+from worker.sampler import read_queue_stats
+
+log = logging.getLogger("worker")
+
+# taken by worker_loop before each reservation; resized by autoscale_concurrency()
+worker_slots = Slots(settings.worker_concurrency)
+WORKER_CONCURRENCY_LIMIT.set_function(lambda: worker_slots.limit)
+WORKER_CONCURRENCY_IN_USE.set_function(lambda: worker_slots.in_use)
+
+# weight of the newest observation in the per-type moving averages
+EWMA_WEIGHT = 0.2
+
+# job type -> moving average of the seconds a job of that type held its slot in this process
+_slot_seconds: dict[str, float] = {}
+
+_queues = bindparam("queues", type_=ARRAY(String))
+
+# Range scan of ix_jobs_created_at_id: the cost follows the window, not the table.
+_arrivals = text("""
+    SELECT type, count(*) AS arrived FROM jobs
+    WHERE created_at > now() - make_interval(secs => :window) AND queue = ANY(:queues)
+    GROUP BY type
+""").bindparams(_queues)
+
+def record_batch(jobs: list[Job], seconds: float) -> None:
+    """
+    Called after each committed batch with the jobs it claimed and how long it held its slot.
+    Jobs put back (deferred, or queued again for a retry) don't count.
+    """
+    for job in jobs:
+        if job.status == JobStatus.queued:
+            continue
+        previous = _slot_seconds.get(job.type)
+        _slot_seconds[job.type] = seconds if previous is None else previous + EWMA_WEIGHT * (seconds - previous)
+
+
+async def autoscale_concurrency() -> None:
+    """
+    Autoscaling loop (off unless settings.autoscale_enabled): every autoscale_interval_seconds,
+    resizes worker_slots to an even split of what the served queues' load needs, across the live
+    workers serving the same queues.
+    Also publishes the replica count the whole load needs, for an external autoscaler.
+    """
+    if not settings.autoscale_enabled:
+        return
+    queues = [q.name for q in parse_queues(settings.worker_queues)]
+    controller = ConcurrencyController(worker_slots)
+
+    while True:
+        await asyncio.sleep(settings.autoscale_interval_seconds)
+        try:
+            await autoscale_once(controller, queues)
+        except Exception:
+            log.exception("autoscale_failed")
+
+
+async def autoscale_once(controller: "ConcurrencyController", queues: list[str]) -> None:
+    window = settings.autoscale_window_seconds
+    stats = await read_queue_stats()
+    async with engine.connect() as conn:
+        res = await conn.execute(_arrivals, {"window": window, "queues": queues})
+        arrivals = {row.type: row.arrived for row in res}
+    # this process counts itself once it is registered; until then (or if unknown) it is alone
+    workers = await queue_backend.live_workers(queues) or 1
+
+    served = [stats[queue] for queue in queues if queue in stats]
+    ready = sum(row.ready for row in served)
+    oldest_wait = max((float(row.oldest_ready or 0) for row in served), default=0.0)
+    arrival_rate = sum(arrivals.values()) / window
+    WORKER_AUTOSCALE_ARRIVAL_RATE.set(arrival_rate)
+
+    slot_seconds = expected_slot_seconds(arrivals)
+    if slot_seconds is None:
+        # nothing ran here yet, so no estimate: only the wait rule in decide() applies
+        target = worker_slots.limit
+    else:
+        WORKER_AUTOSCALE_EXECUTION_SECONDS.set(slot_seconds)
+        needed = required_slots(arrival_rate, ready, slot_seconds)
+        WORKER_AUTOSCALE_DESIRED_REPLICAS.set(math.ceil(needed / settings.autoscale_max_concurrency))
+        # an even split across the workers serving the same queues: sizing by this process's share of
+        # recent throughput would feed on itself (more slots, more jobs taken, a bigger share next round)
+        target = math.ceil(needed / workers)
+
+    WORKER_AUTOSCALE_TARGET_CONCURRENCY.set(target)
+    controller.decide(target, oldest_wait, time.monotonic())
+
+
+def expected_slot_seconds(arrivals: dict[str, int]) -> float | None:
+    """
+    Slot time of an arriving job: per-type averages weighted by the recent type mix,
+    types not seen here yet counting as the average type.
+    """
+    if not _slot_seconds:
+        return None
+    fallback = sum(_slot_seconds.values()) / len(_slot_seconds)
+    total = sum(arrivals.values())
+    if not total:
+        return fallback
+    return sum(n * _slot_seconds.get(job_type, fallback) for job_type, n in arrivals.items()) / total
+
+
+def required_slots(arrival_rate: float, ready: int, slot_seconds: float) -> float:
+    """
+    Slots needed across all workers: keep up with arrivals at autoscale_target_utilization,
+    plus drain the ready backlog within autoscale_target_wait_seconds.
+    A slot takes worker_batch_size jobs at a time.
+    """
+    busy = arrival_rate * slot_seconds / settings.autoscale_target_utilization
+    drain = ready * slot_seconds / settings.autoscale_target_wait_seconds
+    return (busy + drain) / settings.worker_batch_size
+
+
+class ConcurrencyController:
+    """
+    Hysteresis around the target, within autoscale_min/max_concurrency: up at once; down only once
+    the target stayed lower, and ready jobs waited under half the target wait, for the scale-down delay.
+    Scaling down never interrupts running jobs, see Slots.
+    """
+
+    def __init__(self, slots: Slots) -> None:
+        self.slots = slots
+        self.lower_since: float | None = None
+
+    def decide(self, target: int, oldest_wait: float, now: float) -> int:
+        current = self.slots.limit
+        if oldest_wait > settings.autoscale_target_wait_seconds:
+            # over the target wait although the estimate says there are enough slots
+            # (a slower dependency, jobs the averages don't cover yet): one more per round
+            target = max(target, current + 1)
+        target = min(max(target, settings.autoscale_min_concurrency), settings.autoscale_max_concurrency)
+
+        if target >= current or oldest_wait > settings.autoscale_target_wait_seconds / 2:
+            self.lower_since = None
+            if target > current:
+                self.resize(target, "up", oldest_wait)
+            return self.slots.limit
+
+        if self.lower_since is None:
+            self.lower_since = now
+        elif now - self.lower_since >= settings.autoscale_scale_down_delay_seconds:
+            self.lower_since = None
+            self.resize(target, "down", oldest_wait)
+        return self.slots.limit
+
+    def resize(self, limit: int, direction: str, oldest_wait: float) -> None:
+        log.info(
+            "worker_concurrency_scaled",
+            extra={"from": self.slots.limit, "to": limit, "oldest_ready_wait_seconds": oldest_wait},
+        )
+        self.slots.resize(limit)
+        WORKER_AUTOSCALE_DECISIONS_TOTAL.labels(direction=direction).inc()
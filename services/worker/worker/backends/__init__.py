@@ -0,0 +1,17 @@
+from worker.backends.base import QueueBackend
+from worker.core.config import settings
+
+
+def get_backend() -> QueueBackend:
+    if settings.queue_backend == "postgres":
+        from worker.backends.postgres_backend import PostgresBackend
+        return PostgresBackend()
+    if settings.queue_backend == "streams":
+        from worker.backends.streams_backend import StreamsBackend
+        return StreamsBackend()
+    from worker.backends.redis_backend import RedisBackend
+    return RedisBackend()
+
+
+# one per process: backends keep per-process state (LISTEN wakeups, delivered stream entries)
+queue_backend = get_backend()
@@ -0,0 +1,78 @@
+from abc import ABC, abstractmethod
+from typing import Coroutine
+
+
+class QueueBackend(ABC):
+    """
+    Where workers find the ids of jobs to run. The jobs table stays the source of truth:
+    a reserved id still has to be claimed in the database (worker.db.claim) before it runs,
+    so a backend may hand out an id twice (at least once), never lose one.
+    """
+
+    @abstractmethod
+    async def reserve_job_ids(
+            self,
+            queues: list[str],
+            count: int,
+            lease_seconds: float,
+            timeout_seconds: float,
+    ) -> list[str]:
+        """
+        Up to count ids from the given queues (earlier queues first), each leased for lease_seconds.
+        Waits up to timeout_seconds for work when there is none; may return [].
+        """
+
+    @abstractmethod
+    async def ack_job_ids(self, job_ids: list[str]) -> None:
+        """Releases the leases of reserved ids once their transaction committed."""
+
+    async def release_unclaimed_job_ids(self, job_ids: list[str]) -> None:
+        """
+        Reserved ids the database claim turned down (job already running elsewhere, finished or gone),
+        once the batch committed. Acked like the others unless the backend's leases are shared.
+        """
+        await self.ack_job_ids(job_ids)
+
+    async def abandon_job_ids(self, job_ids: list[str]) -> None:
+        """
+        Reserved ids of a batch that failed before it was acked (its transaction rolled back).
+        Nothing is released: the leases are left to expire, so the jobs come back after lease_seconds.
+        """
+        return
+
+    @abstractmethod
+    async def hold_job_ids(self, job_ids_by_queue: dict[str, list[str]], lease_seconds: float) -> None:
+        """
+        Protects ids of jobs created in a transaction that is not committed yet, see enqueue_job_ids().
+        job_ids_by_queue: queue -> [job_id]
+        """
+
+    @abstractmethod
+    async def enqueue_job_ids(self, job_ids_by_queue: dict[str, list[str]]) -> None:
+        """Makes held ids available once their jobs are committed. job_ids_by_queue: queue -> [job_id]"""
+
+    @abstractmethod
+    async def schedule_retries(self, retries: dict[str, dict[str, float]]) -> None:
+        """Committed retries, due at run_after. retries: queue -> {job_id: run_after epoch seconds}"""
+
+    @abstractmethod
+    async def publish_job_events(self, statuses: dict[str, str]) -> None:
+        """Tells API processes about committed status changes. statuses: job_id -> status"""
+
+    async def sample(self, queues: list[str]) -> dict[tuple[str, str], int]:
+        """
+        Sizes on the backend's side for worker.sampler: (queue, state) -> entries,
+        state one of queued, in_flight, delayed; queue "*" for counts not kept per queue.
+        """
+        return {}
+
+    async def live_workers(self, queues: list[str]) -> int | None:
+        """
+        Worker processes currently consuming exactly these queues (in any order) from this backend,
+        for the autoscaler; None if unknown.
+        """
+        return None
+
+    def background_tasks(self) -> list[Coroutine]:
+        """Loops the backend needs next to worker_loop() (reaper, promoter, ...)."""
+        return []
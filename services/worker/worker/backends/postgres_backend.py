@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Coroutine
+
+import asyncpg
+from sqlalchemy import Float, String, Text, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import make_url
+
+from worker.backends.base import QueueBackend
+from worker.core.config import settings
+from worker.core.queues import parse_queues, queue_set_key
+from worker.db.session import engine
+
+log = logging.getLogger("worker")
+
+# NOTIFY channels, same names in the API (app.core.queue, app.events)
+JOBS_CHANNEL = os.getenv("JOBS_CHANNEL", "jobrunner_jobs")
+EVENTS_CHANNEL = os.getenv("EVENTS_CHANNEL", "jobrunner_events")
+
+# Oldest ready jobs of one queue, leased in place. SKIP LOCKED: concurrent reservations
+# (and rows locked by a running job's transaction) are passed over, never waited on.
+_reserve = text("""
+    UPDATE jobs SET lease_expires_at = now() + make_interval(secs => :lease_seconds)
+    WHERE id IN (
+        SELECT id FROM jobs
+        WHERE status = 'queued'
+          AND queue = :queue
+          AND (run_after IS NULL OR run_after <= now())
+          AND (lease_expires_at IS NULL OR lease_expires_at <= now())
+        ORDER BY created_at
+        LIMIT :count
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id
+""").bindparams(bindparam("lease_seconds", type_=Float))
+
+# Seconds until the next queued job becomes ready (a retry coming due, a lease running out).
+_ready_in = text("""
+    SELECT extract(epoch FROM min(ready_at) - now()) FROM (
+        SELECT greatest(run_after, lease_expires_at) AS ready_at FROM jobs
+        WHERE status = 'queued' AND queue = ANY(:queues)
+    ) pending
+    WHERE ready_at > now()
+""").bindparams(bindparam("queues", type_=ARRAY(String)))
+
+# Every worker process holds exactly one LISTEN connection, tagged with this application_name
+# and the queues it serves (see listener_application_name).
+LISTENER_APPLICATION_NAME = os.getenv("LISTENER_APPLICATION_NAME", "jobrunner-worker-listener")
+
+_live_listeners = text("SELECT count(*) FROM pg_stat_activity WHERE application_name = :name")
+
+_notify = text("SELECT pg_notify(:channel, payload) FROM unnest(:payloads) AS payload").bindparams(
+    bindparam("payloads", type_=ARRAY(Text))
+)
+
+
+def listener_application_name(queues: list[str]) -> str:
+    # a digest of the queue set: application_name is cut at 63 bytes, queue names can be long
+    digest = hashlib.blake2b(queue_set_key(queues).encode(), digest_size=6).hexdigest()
+    return f"{LISTENER_APPLICATION_NAME} {digest}"
+
+
+class PostgresBackend(QueueBackend):
+    """
+    No broker: the jobs table is the queue. Workers take queued rows with
+    UPDATE ... FOR UPDATE SKIP LOCKED, setting lease_expires_at, and sleep on LISTEN until
+    a producer NOTIFYs. A lease ends when the claim commits (claims clear it) or when it expires,
+    so a crashed worker's jobs come back by themselves: no reaper, promoter or heartbeat.
+    Suited to moderate loads; every reservation is a write on the jobs table.
+    """
+
+    def __init__(self) -> None:
+        # replaced on every notification, so a waiter can't miss one that lands while it queries
+        self._wakeup = asyncio.Event()
+
+    async def reserve_job_ids(self, queues, count, lease_seconds, timeout_seconds):
+        wakeup = self._wakeup
+        ids, ready_in = await self._reserve(queues, count, lease_seconds)
+        if ids:
+            return ids
+
+        wait = timeout_seconds if ready_in is None else min(timeout_seconds, ready_in)
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout=wait)
+        except asyncio.TimeoutError:
+            pass
+        ids, _ = await self._reserve(queues, count, lease_seconds)
+        return ids
+
+    async def _reserve(self, queues: list[str], count: int, lease_seconds: float) -> tuple[list[str], float | None]:
+        ids: list[str] = []
+        async with engine.begin() as conn:
+            for queue in queues:
+                if len(ids) >= count:
+                    break
+                res = await conn.execute(
+                    _reserve, {"queue": queue, "count": count - len(ids), "lease_seconds": lease_seconds}
+                )
+                ids.extend(str(job_id) for job_id in res.scalars())
+            if ids:
+                return ids, None
+            ready_in = await conn.scalar(_ready_in, {"queues": queues})
+        return [], None if ready_in is None else float(ready_in)
+
+    async def ack_job_ids(self, job_ids):
+        # the claim cleared lease_expires_at in the transaction that ran the job
+        return
+
+    async def hold_job_ids(self, job_ids_by_queue, lease_seconds):
+        # uncommitted rows are invisible to reservations anyway
+        return
+
+    async def enqueue_job_ids(self, job_ids_by_queue):
+        await self._notify(JOBS_CHANNEL, [queue for queue, job_ids in job_ids_by_queue.items() if job_ids])
+
+    async def schedule_retries(self, retries):
+        # the retry row is already queued: waiters only need to re-check when it comes due
+        await self._notify(JOBS_CHANNEL, [queue for queue, scores in retries.items() if scores])
+
+    async def publish_job_events(self, statuses):
+        await self._notify(
+            EVENTS_CHANNEL,
+            [json.dumps({"job_id": job_id, "status": status}) for job_id, status in statuses.items()],
+        )
+
+    async def _notify(self, channel: str, payloads: list[str]) -> None:
+        if not payloads:
+            return
+        async with engine.begin() as conn:
+            await conn.execute(_notify, {"channel": channel, "payloads": payloads})
+
+    def _wake(self, *_args) -> None:
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+
+    async def listen_for_jobs(self) -> None:
+        """
+        One LISTEN connection per worker process, outside the pool.
+        Every notification wakes every waiting slot; the ones that find nothing wait again.
+        Notifications missed while reconnecting are covered by the reservation timeout.
+        """
+        dsn = make_url(settings.database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        application_name = listener_application_name([q.name for q in parse_queues(settings.worker_queues)])
+        while True:
+            try:
+                conn = await asyncpg.connect(
+                    dsn, server_settings={"application_name": application_name}
+                )
+                try:
+                    await conn.add_listener(JOBS_CHANNEL, self._wake)
+                    self._wake()
+                    while True:
+                        await asyncio.sleep(settings.heartbeat_interval_seconds)
+                        # a dead connection would otherwise go unnoticed: it just never notifies
+                        await conn.execute("SELECT 1")
+                finally:
+                    await conn.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("job_listener_failed")
+                await asyncio.sleep(1)
+
+    async def sample(self, queues):
+        # queued rows are the queue itself: worker.sampler's jobs table gauges already cover it
+        return {}
+
+    async def live_workers(self, queues):
+        # no heartbeat here: count the LISTEN connections of workers serving the same queues
+        async with engine.connect() as conn:
+            return await conn.scalar(_live_listeners, {"name": listener_application_name(queues)})
+
+    def background_tasks(self) -> list[Coroutine]:
+        return [self.listen_for_jobs()]  # Concept: LISTEN/NOTIFY wakeups
@@ -0,0 +1,55 @@
+import math
+from typing import Coroutine
+
+from worker.backends.base import QueueBackend
+from worker.core import redis
+from worker.core.config import settings
+from worker.core.queues import queue_set_key
+from worker.heartbeat import heartbeat_loop
+from worker.reaper import requeue_stuck_jobs
+from worker.scheduler import promote_delayed_retries
+
+
+class RedisBackend(QueueBackend):
+    """
+    Redis lists per queue, a lease sorted set, delayed sets for retries and pub/sub for events
+    (see worker.core.redis). Needs the reaper, the retry promoter and the heartbeat running.
+    """
+
+    async def reserve_job_ids(self, queues, count, lease_seconds, timeout_seconds):
+        return await redis.reserve_job_ids(queues, count, lease_seconds, timeout_seconds=timeout_seconds)
+
+    async def ack_job_ids(self, job_ids):
+        await redis.ack_job_ids(job_ids)
+
+    async def release_unclaimed_job_ids(self, job_ids):
+        # Leases are keyed by job id: after a duplicate queue entry this is the lease the worker
+        # running the job renews, and its crash must still expire it. Nobody's lease: the reaper drops it.
+        return
+
+    async def hold_job_ids(self, job_ids_by_queue, lease_seconds):
+        # the reaper queues held ids that are committed but never pushed
+        job_ids = [job_id for job_ids in job_ids_by_queue.values() for job_id in job_ids]
+        await redis.lease_job_ids(job_ids, lease_seconds)
+
+    async def enqueue_job_ids(self, job_ids_by_queue):
+        await redis.push_leased_job_ids(job_ids_by_queue)
+
+    async def schedule_retries(self, retries):
+        await redis.schedule_retries(retries)
+
+    async def publish_job_events(self, statuses):
+        await redis.publish_job_events(statuses)
+
+    async def sample(self, queues):
+        return await redis.queue_sizes(queues)
+
+    async def live_workers(self, queues):
+        return await redis.live_workers(queue_set_key(queues), math.ceil(settings.lease_seconds))
+
+    def background_tasks(self) -> list[Coroutine]:
+        return [
+            requeue_stuck_jobs(),       # Concept: reaper loop running in parallel
+            promote_delayed_retries(),  # Concept: durable delayed retries
+            heartbeat_loop(),           # Concept: liveness + lease renewal
+        ]
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import math
+import time
+from typing import Coroutine
+
+from worker.backends.base import QueueBackend
+from worker.core import redis, streams
+from worker.core.config import settings
+from worker.core.queues import queue_set_key
+from worker.core.metrics import (
+    WORKER_STREAM_ENTRIES_RECLAIMED_TOTAL,
+    WORKER_STREAM_OLDEST_PENDING_SECONDS,
+)
+from worker.heartbeat import WORKER_ID, heartbeat_loop
+from worker.scheduler import promote_delayed_retries
+
+log = logging.getLogger("worker")
+
+
+class StreamsBackend(QueueBackend):
+    """
+    One Redis stream per queue, read through one consumer group (consumer = this worker process).
+    XREADGROUP ... COUNT takes a batch, XACK releases it in O(1) per entry, and entries of a dead
+    or stalled consumer are taken over (XPENDING IDLE + XCLAIM) once idle for lease_seconds;
+    live workers keep theirs fresh (see renew_delivered). The consumer group's pending entries list replaces
+    the lease set and the reaper. Retries use the same delayed sets as the redis backend.
+    """
+
+    def __init__(self) -> None:
+        # job id -> (stream key, entry id) delivered to this process and not acked yet;
+        # a list, since an id enqueued twice can be delivered twice
+        self._delivered: dict[str, list[tuple[str, str]]] = {}
+        self._next_reclaim = 0.0
+
+    async def reserve_job_ids(self, queues, count, lease_seconds, timeout_seconds):
+        entries: list[streams.Entry] = []
+        if time.monotonic() >= self._next_reclaim:
+            # stalled entries first, at most once per reaper interval per process
+            self._next_reclaim = time.monotonic() + settings.reaper_interval_seconds
+            for queue in queues:
+                if len(entries) >= count:
+                    break
+                claimed = await streams.claim_stale_entries(queue, WORKER_ID, lease_seconds, count - len(entries))
+                if claimed:
+                    WORKER_STREAM_ENTRIES_RECLAIMED_TOTAL.labels(queue=queue).inc(len(claimed))
+                    log.warning("stream_entries_reclaimed", extra={"queue": queue, "entries": len(claimed)})
+                entries.extend(claimed)
+
+        entries.extend(await self._read(queues, count - len(entries)))
+        if not entries:
+            # only the first queue can be waited on; the others are re-checked after the wait
+            entries = await streams.read_entries(queues[0], WORKER_ID, count, block_seconds=timeout_seconds)
+            if not entries and len(queues) > 1:
+                entries = await self._read(queues[1:], count)
+
+        for key, entry_id, job_id in entries:
+            self._delivered.setdefault(job_id, []).append((key, entry_id))
+        return [job_id for _key, _entry_id, job_id in entries]
+
+    async def _read(self, queues: list[str], count: int) -> list[streams.Entry]:
+        entries: list[streams.Entry] = []
+        for queue in queues:
+            if len(entries) >= count:
+                break
+            entries.extend(await streams.read_entries(queue, WORKER_ID, count - len(entries)))
+        return entries
+
+    async def ack_job_ids(self, job_ids):
+        # committed: every entry of these jobs delivered here is done, duplicates included
+        by_key: dict[str, list[str]] = {}
+        for job_id in job_ids:
+            for key, entry_id in self._delivered.pop(job_id, ()):
+                by_key.setdefault(key, []).append(entry_id)
+        await streams.ack_entries(by_key)
+
+    async def release_unclaimed_job_ids(self, job_ids):
+        # One entry per id, standing for the one this reservation got: another slot of this process
+        # may be running the job from a second entry, which must stay pending (and renewed).
+        # Entries of one job are interchangeable, so which of them is acked doesn't matter.
+        by_key: dict[str, list[str]] = {}
+        for key, entry_id in self._forget(job_ids):
+            by_key.setdefault(key, []).append(entry_id)
+        await streams.ack_entries(by_key)
+
+    async def abandon_job_ids(self, job_ids):
+        # stop renewing them: once idle for lease_seconds, claim_stale_entries() delivers them again
+        self._forget(job_ids)
+
+    def _forget(self, job_ids: list[str]) -> list[tuple[str, str]]:
+        """Takes one delivered entry per id out of _delivered (the latest one)."""
+        forgotten: list[tuple[str, str]] = []
+        for job_id in job_ids:
+            entries = self._delivered.get(job_id)
+            if not entries:
+                continue
+            forgotten.append(entries.pop())
+            if not entries:
+                del self._delivered[job_id]
+        return forgotten
+
+    async def hold_job_ids(self, job_ids_by_queue, lease_seconds):
+        await streams.hold_job_ids(job_ids_by_queue, lease_seconds)
+
+    async def enqueue_job_ids(self, job_ids_by_queue):
+        await streams.push_held_job_ids(job_ids_by_queue)
+
+    async def schedule_retries(self, retries):
+        await redis.schedule_retries(retries)
+
+    async def publish_job_events(self, statuses):
+        await redis.publish_job_events(statuses)
+
+    async def renew_delivered(self) -> None:
+        """
+        Keeps the entries this process is working on from looking stalled, every heartbeat.
+        A worker that stops renewing loses them to claim_stale_entries() after lease_seconds.
+        """
+        while True:
+            by_key: dict[str, list[str]] = {}
+            for entries in list(self._delivered.values()):
+                for key, entry_id in entries:
+                    by_key.setdefault(key, []).append(entry_id)
+            try:
+                # half an interval: our own entries are due by now, one just taken over by another consumer isn't
+                await streams.renew_entries(WORKER_ID, by_key, settings.heartbeat_interval_seconds / 2)
+            except Exception:
+                log.exception("stream_renew_failed", extra={"worker_id": WORKER_ID})
+            await asyncio.sleep(settings.heartbeat_interval_seconds)
+
+    async def push_expired_held(self) -> None:
+        """
+        Every reaper interval: pushes held ids whose worker died before enqueueing them.
+        """
+        while True:
+            try:
+                while await streams.push_expired_held(time.time(), settings.reaper_batch_size) >= settings.reaper_batch_size:
+                    pass
+            except Exception:
+                log.exception("stream_held_recovery_failed")
+            await asyncio.sleep(settings.reaper_interval_seconds)
+
+    async def sample(self, queues):
+        sizes: dict[tuple[str, str], int] = {}
+        for queue in queues:
+            pending, lag, oldest_seconds = await streams.pending_summary(queue)
+            sizes[(queue, "in_flight")] = pending
+            if lag is not None:
+                sizes[(queue, "queued")] = lag
+            WORKER_STREAM_OLDEST_PENDING_SECONDS.labels(queue=queue).set(oldest_seconds)
+        sizes.update(await redis.delayed_sizes(queues))
+        return sizes
+
+    async def live_workers(self, queues):
+        # registered by heartbeat_loop(), as with the redis backend
+        return await redis.live_workers(queue_set_key(queues), math.ceil(settings.lease_seconds))
+
+    def background_tasks(self) -> list[Coroutine]:
+        return [
+            promote_delayed_retries(streams.promote_due_retries),  # Concept: durable delayed retries
+            heartbeat_loop(),                                      # Concept: liveness
+            self.renew_delivered(),                                # Concept: lease renewal
+            self.push_expired_held(),                              # Concept: held-id recovery
+        ]
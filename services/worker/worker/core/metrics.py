@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 WORKER_JOB_CLAIMED_TOTAL = Counter(
     "worker_job_claimed_total",
@@ -24,8 +24,108 @@ WORKER_JOB_RETRY_SCHEDULED_TOTAL = Counter(
     ["job_type"],
 )
 
+WORKER_JOB_DEFERRED_TOTAL = Counter(
+    "worker_job_deferred_total",
+    "Total number of claimed jobs put back because their type was at max concurrency",
+    ["job_type"],
+)
+
 WORKER_JOB_DURATION_SECONDS = Histogram(
     "worker_job_duration_seconds",
     "Time spent processing a job in seconds",
     ["job_type"],
-)
\ No newline at end of file
+)
+WORKER_JOBS_ARCHIVED_TOTAL = Counter(
+    "worker_jobs_archived_total",
+    "Total number of finished jobs moved from jobs to jobs_archive by retention",
+)
+
+WORKER_ARCHIVE_PARTITIONS_DROPPED_TOTAL = Counter(
+    "worker_archive_partitions_dropped_total",
+    "Total number of expired jobs_archive partitions dropped by retention",
+)
+
+WORKER_STREAM_ENTRIES_RECLAIMED_TOTAL = Counter(
+    "worker_stream_entries_reclaimed_total",
+    "Total number of stream entries taken over from stalled consumers (streams queue backend)",
+    ["queue"],
+)
+
+WORKER_STREAM_OLDEST_PENDING_SECONDS = Gauge(
+    "worker_stream_oldest_pending_seconds",
+    "Seconds since the oldest pending stream entry was delivered or renewed (streams queue backend)",
+    ["queue"],
+)
+
+WORKER_JOB_QUEUE_WAIT_SECONDS = Histogram(
+    "worker_job_queue_wait_seconds",
+    "Time from a job becoming due (created_at, or run_after for retries) to its claim",
+    ["queue"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+)
+
+WORKER_STAGE_DURATION_SECONDS = Histogram(
+    "worker_stage_duration_seconds",
+    "Time per reserved batch spent in a processing stage: claim (UPDATE/SELECT ... FOR UPDATE), "
+    "commit, ack (releasing the reservation); handler time is worker_job_duration_seconds",
+    ["stage"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+# kept current by worker.sampler, not computed per scrape
+WORKER_QUEUE_JOBS = Gauge(
+    "worker_queue_jobs",
+    "Jobs per queue and state (ready, delayed, running) in the jobs table",
+    ["queue", "state"],
+)
+
+WORKER_QUEUE_OLDEST_READY_AGE_SECONDS = Gauge(
+    "worker_queue_oldest_ready_age_seconds",
+    "How long the oldest job that is due and not claimed yet has been waiting, per queue",
+    ["queue"],
+)
+
+WORKER_QUEUE_BROKER_ENTRIES = Gauge(
+    "worker_queue_broker_entries",
+    "Entries on the queue backend's side per queue and state (queued, in_flight, delayed); "
+    "queue=\"*\" for backend-wide counts",
+    ["queue", "state"],
+)
+
+# worker.autoscaler
+WORKER_CONCURRENCY_LIMIT = Gauge(
+    "worker_concurrency_limit",
+    "Slots this worker process may run at once (worker_concurrency, resized by the autoscaler)",
+)
+
+WORKER_CONCURRENCY_IN_USE = Gauge(
+    "worker_concurrency_in_use",
+    "Slots of this worker process currently running reserved jobs",
+)
+
+WORKER_AUTOSCALE_TARGET_CONCURRENCY = Gauge(
+    "worker_autoscale_target_concurrency",
+    "Slots this worker process needs for an even split of the load across live workers serving the same queues, before hysteresis and min/max bounds",
+)
+
+WORKER_AUTOSCALE_DESIRED_REPLICAS = Gauge(
+    "worker_autoscale_desired_replicas",
+    "Worker processes needed for the load of the queues this worker serves, "
+    "at autoscale_max_concurrency slots each (for an external autoscaler)",
+)
+
+WORKER_AUTOSCALE_ARRIVAL_RATE = Gauge(
+    "worker_autoscale_arrival_rate",
+    "Jobs per second created in the queues this worker serves, over the autoscale window",
+)
+
+WORKER_AUTOSCALE_EXECUTION_SECONDS = Gauge(
+    "worker_autoscale_execution_seconds",
+    "Expected handler time of an arriving job: per-type averages weighted by the recent job type mix",
+)
+
+WORKER_AUTOSCALE_DECISIONS_TOTAL = Counter(
+    "worker_autoscale_decisions_total",
+    "Total number of concurrency changes made by the autoscaler",
+    ["direction"],
+)
@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class QueueWeight:
+    name: str
+    weight: int
+
+
+def parse_queues(spec: str) -> list[QueueWeight]:
+    """
+        "interactive:10,default:3,bulk" -> queues in priority order with weights (default 1).
+        """
+    queues: list[QueueWeight] = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition(":")
+        queues.append(QueueWeight(name=name.strip(), weight=int(weight) if weight else 1))
+
+    if not queues:
+        raise ValueError("worker_queues must name at least one queue")
+    if any(q.weight < 1 for q in queues):
+        raise ValueError("queue weights must be >= 1")
+    return queues
+
+
+def queue_set_key(names: list[str]) -> str:
+    """
+        Identifies a set of served queues, whatever their order or weights:
+        workers with the same key split the same load (see worker.autoscaler).
+        """
+    return ",".join(sorted(set(names)))
+
+
+class QueueSelector:
+    """
+    Decides which order a worker tries its queues in, per reservation.
+    - strict:   always the configured order, so a later queue only runs when earlier ones are empty
+    - weighted: smooth weighted round-robin picks the queue tried first,
+                the rest follow in configured order (so an idle first pick never wastes a slot)
+    """
+
+    def __init__(self, queues: list[QueueWeight], policy: str) -> None:
+        if policy not in ("strict", "weighted"):
+            raise ValueError(f"Unknown queue policy: {policy}")
+        self.queues = queues
+        self.policy = policy
+        self._current = {q.name: 0 for q in queues}
+        self._total = sum(q.weight for q in queues)
+
+    @property
+    def names(self) -> list[str]:
+        return [q.name for q in self.queues]
+
+    def order(self) -> list[str]:
+        names = self.names
+        if self.policy == "strict" or len(names) == 1:
+            return names
+
+        for q in self.queues:
+            self._current[q.name] += q.weight
+        first = max(names, key=lambda name: self._current[name])
+        self._current[first] -= self._total
+
+        return [first, *(name for name in names if name != first)]
@@ -1,24 +1,285 @@
+import json
 import os
+import time
 from redis.asyncio import Redis
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
 QUEUE_NAME = os.getenv("QUEUE_NAME", "jobrunner:queue")
-PROCESSING_NAME = os.getenv("PROCESSING_NAME", "jobrunner:processing")
+PROCESSING_NAME = os.getenv("PROCESSING_NAME", "jobrunner:processing")  # legacy, pre-lease
+LEASES_NAME = os.getenv("LEASES_NAME", "jobrunner:leases")
+WORKERS_NAME = os.getenv("WORKERS_NAME", "jobrunner:workers")
+DELAYED_NAME = os.getenv("DELAYED_NAME", "jobrunner:delayed")
+EVENTS_NAME = os.getenv("EVENTS_NAME", "jobrunner:events")
+JOB_CACHE_PREFIX = os.getenv("JOB_CACHE_PREFIX", "jobrunner:job:")  # API's shared job cache
+DEFAULT_QUEUE = "default"
 
 redis_client = Redis.from_url(REDIS_URL, decode_responses=True)
 
-async def reserve_job_id(timeout_seconds: int = 30) -> str | None:
+def serving_key(queue_set: str) -> str:
+    # live workers serving one set of queues (see worker.core.queues.queue_set_key)
+    return f"{WORKERS_NAME}:serving:{queue_set}"
+
+def queue_key(queue: str) -> str:
+    # the default queue keeps the original key, so existing deployments keep working
+    return QUEUE_NAME if queue == DEFAULT_QUEUE else f"{QUEUE_NAME}:{queue}"
+
+def delayed_key(queue: str) -> str:
+    return DELAYED_NAME if queue == DEFAULT_QUEUE else f"{DELAYED_NAME}:{queue}"
+
+# KEYS[1] is the lease set, KEYS[2..] the queues in the order to try.
+# Pops up to ARGV[1] ids from the consuming ends of those queues (earlier queues first)
+# and leases each one until ARGV[2] (epoch seconds), in one atomic step.
+# GT: a duplicate entry of a job that is already leased never shortens that lease.
+_reserve = redis_client.register_script("""
+local count = tonumber(ARGV[1])
+local ids = {}
+for k = 2, #KEYS do
+    local wanted = count - #ids
+    if wanted <= 0 then
+        break
+    end
+    local popped = redis.call('RPOP', KEYS[k], wanted)
+    if popped then
+        for _, job_id in ipairs(popped) do
+            redis.call('ZADD', KEYS[1], 'GT', ARGV[2], job_id)
+            ids[#ids + 1] = job_id
+        end
+    end
+end
+return ids
+""")
+
+async def reserve_job_ids(
+        queues: list[str],
+        count: int,
+        lease_seconds: float,
+        timeout_seconds: float = 30,
+) -> list[str]:
     """
         Reservation = reliably take work.
-        brpoplpush atomically moves one item from QUEUE_NAME
-        to PROCESSING_NAME, so the job is not lost if the worker crashes.
+        Up to count ids move from the given queues (tried in order) into the
+        LEASES_NAME sorted set, scored by lease expiry, so the job is not lost
+        if the worker crashes. When every queue is empty we wait on the first one.
+        """
+    keys = [LEASES_NAME, *(queue_key(queue) for queue in queues)]
+    ids = await _reserve(keys=keys, args=[count, time.time() + lease_seconds])
+    if ids:
+        return ids
+
+    # BLMOVE from the tail of a list back onto its own tail is a no-op move,
+    # so this only waits for work to show up, it never takes it.
+    first = queue_key(queues[0])
+    woke = await redis_client.blmove(first, first, timeout_seconds, "RIGHT", "RIGHT")
+    if woke is None and len(queues) == 1:
+        return []
+
+    return await _reserve(keys=keys, args=[count, time.time() + lease_seconds])
+
+async def ack_job_ids(job_ids: list[str]) -> None:
+    """
+        Ack = confirm jobs are fully processed.
+        One ZREM for the whole batch, O(log N) per id. Only for ids this worker claimed:
+        the lease is shared by every reservation of the same job id.
+        """
+    if not job_ids:
+        return
+    await redis_client.zrem(LEASES_NAME, *job_ids)
+
+async def lease_job_ids(job_ids: list[str], lease_seconds: float) -> None:
+    """
+        Leases ids that are not in any queue yet (e.g. child jobs about to be committed),
+        so the reaper queues them if they are committed but never pushed.
+        """
+    if not job_ids:
+        return
+    expires = time.time() + lease_seconds
+    await redis_client.zadd(LEASES_NAME, {job_id: expires for job_id in job_ids})
+
+# For each id in ARGV: if it still holds a lease, drop the lease and push the id
+# to the producer end of KEYS[2]. An id whose lease is gone was already handled by the reaper.
+_push_leased = redis_client.register_script("""
+local pushed = 0
+for i = 1, #ARGV do
+    if redis.call('ZREM', KEYS[1], ARGV[i]) == 1 then
+        redis.call('LPUSH', KEYS[2], ARGV[i])
+        pushed = pushed + 1
+    end
+end
+return pushed
+""")
+
+async def push_leased_job_ids(job_ids_by_queue: dict[str, list[str]]) -> None:
+    """
+        Hands ids leased by lease_job_ids() to their queues, lease release and push in one atomic step.
+        job_ids_by_queue: queue -> [job_id]
+        """
+    for queue, job_ids in job_ids_by_queue.items():
+        if job_ids:
+            await _push_leased(keys=[LEASES_NAME, queue_key(queue)], args=job_ids)
+
+async def expired_leases(now: float, limit: int) -> list[str]:
+    """
+        Up to limit job ids whose lease expired at or before now, oldest first.
+        """
+    return await redis_client.zrangebyscore(LEASES_NAME, "-inf", now, start=0, num=limit)
+
+# For each (action, job_id, score) triple in ARGV[2:], releases the lease if it is
+# still expired at ARGV[1]: 'requeue' pushes the id back to the queue,
+# 'delay' adds it to the delayed set with score, 'extend' re-leases it until score,
+# 'drop' just forgets it. A lease renewed in the meantime is left alone.
+_release_expired = redis_client.register_script("""
+local released = 0
+for i = 2, #ARGV, 3 do
+    local action, job_id = ARGV[i], ARGV[i + 1]
+    local expires = redis.call('ZSCORE', KEYS[1], job_id)
+    if expires and tonumber(expires) <= tonumber(ARGV[1]) then
+        redis.call('ZREM', KEYS[1], job_id)
+        if action == 'requeue' then
+            redis.call('RPUSH', KEYS[2], job_id)
+        elseif action == 'delay' then
+            redis.call('ZADD', KEYS[3], ARGV[i + 2], job_id)
+        elseif action == 'extend' then
+            redis.call('ZADD', KEYS[1], ARGV[i + 2], job_id)
+        end
+        released = released + 1
+    end
+end
+return released
+""")
+
+async def release_expired_leases(now: float, actions: list[tuple[str, str, float]], queue: str) -> int:
+    """
+        Applies the reaper's decisions for one queue in one atomic call.
+        Returns how many leases were released.
         """
-    job_id = await redis_client.brpoplpush(QUEUE_NAME, PROCESSING_NAME, timeout=timeout_seconds)
-    return job_id
+    if not actions:
+        return 0
+    args: list = [now]
+    for action, job_id, score in actions:
+        args.extend((action, job_id, score))
+    return int(await _release_expired(keys=[LEASES_NAME, queue_key(queue), delayed_key(queue)], args=args))
+
+async def heartbeat(
+        worker_id: str,
+        info: dict,
+        job_ids: list[str],
+        lease_seconds: float,
+        ttl_seconds: int,
+        queue_set: str,
+) -> None:
+    """
+        Worker heartbeat, one pipeline round trip:
+        - refreshes the worker's registration hash (expires if heartbeats stop)
+        - records it in the WORKERS_NAME sorted set, and in the one of the queues it serves,
+          and forgets workers gone silent
+        - pushes the leases of its in-flight jobs forward (only existing leases, only later)
+        """
+    now = time.time()
+    key = f"{WORKERS_NAME}:{worker_id}"
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.hset(key, mapping={**info, "last_heartbeat": now, "in_flight": json.dumps(job_ids)})
+        pipe.expire(key, ttl_seconds)
+        pipe.zadd(WORKERS_NAME, {worker_id: now})
+        pipe.zremrangebyscore(WORKERS_NAME, "-inf", now - ttl_seconds)
+        serving = serving_key(queue_set)
+        pipe.zadd(serving, {worker_id: now})
+        pipe.zremrangebyscore(serving, "-inf", now - ttl_seconds)
+        pipe.expire(serving, ttl_seconds)
+        if job_ids:
+            pipe.zadd(LEASES_NAME, {job_id: now + lease_seconds for job_id in job_ids}, xx=True, gt=True)
+        await pipe.execute()
+
+async def live_workers(queue_set: str, ttl_seconds: int) -> int:
+    """Workers serving queue_set that sent a heartbeat within ttl_seconds (see heartbeat())."""
+    return await redis_client.zcount(serving_key(queue_set), time.time() - ttl_seconds, "+inf")
+
+# Legacy reservations (before leases) sat in a processing list.
+# Push anything left there back to the consuming end of the queue.
+_drain_legacy = redis_client.register_script("""
+local moved = 0
+while redis.call('LMOVE', KEYS[1], KEYS[2], 'RIGHT', 'RIGHT') do
+    moved = moved + 1
+end
+return moved
+""")
+
+async def requeue_legacy_processing() -> int:
+    return int(await _drain_legacy(keys=[PROCESSING_NAME, QUEUE_NAME]))
+
+
+# Moves up to ARGV[2] ids with score <= ARGV[1] from the delayed set to the queue.
+# rpush puts retries at the consuming end, same as the old in-process requeue.
+_promote_due = redis_client.register_script("""
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+if #ids > 0 then
+    redis.call('ZREM', KEYS[1], unpack(ids))
+    redis.call('RPUSH', KEYS[2], unpack(ids))
+end
+return #ids
+""")
+
+async def schedule_retries(retries: dict[str, dict[str, float]]) -> None:
+    """
+        Durable delayed retry.
+        Adds job ids to their queue's delayed sorted set, scored by run_after (epoch seconds).
+        retries: queue -> {job_id: run_after}
+        """
+    retries = {queue: scores for queue, scores in retries.items() if scores}
+    if not retries:
+        return
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for queue, scores in retries.items():
+            pipe.zadd(delayed_key(queue), scores)
+        await pipe.execute()
+
+async def promote_due_retries(queue: str, now: float, limit: int) -> int:
+    """
+        Atomically moves due retries of one queue into it. Returns how many were moved.
+        """
+    return int(await _promote_due(keys=[delayed_key(queue), queue_key(queue)], args=[now, limit]))
+
+
+async def publish_job_events(statuses: dict[str, str]) -> None:
+    """
+        Tells API processes waiting on these jobs (long-poll, SSE) about their new status,
+        after dropping the jobs from the API's shared cache (API processes drop their
+        in-process copies when they get the event).
+        Pub/sub is fire-and-forget: nobody listening means nothing to do.
+        statuses: job_id -> status
+        """
+    if not statuses:
+        return
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.delete(*(JOB_CACHE_PREFIX + job_id for job_id in statuses))
+        for job_id, status in statuses.items():
+            pipe.publish(EVENTS_NAME, json.dumps({"job_id": job_id, "status": status}))
+        await pipe.execute()
+
+
+async def queue_sizes(queues: list[str]) -> dict[tuple[str, str], int]:
+    """
+        LLEN / ZCARD of the given queues, their delayed sets and the lease set, one pipeline.
+        (queue, state) -> entries; the lease set is shared by all queues (queue "*").
+        """
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for queue in queues:
+            pipe.llen(queue_key(queue))
+            pipe.zcard(delayed_key(queue))
+        pipe.zcard(LEASES_NAME)
+        counts = await pipe.execute()
+
+    sizes: dict[tuple[str, str], int] = {("*", "in_flight"): counts[-1]}
+    for i, queue in enumerate(queues):
+        sizes[(queue, "queued")] = counts[2 * i]
+        sizes[(queue, "delayed")] = counts[2 * i + 1]
+    return sizes
 
-async def ack_job_id(job_id: str) -> None:
+async def delayed_sizes(queues: list[str]) -> dict[tuple[str, str], int]:
     """
-        Ack = confirm job is fully processed.
-        lrem removes ONE matching entry from processing list.
+        ZCARD of the given queues' delayed sets, for backends that keep only retries here.
         """
-    await redis_client.lrem(PROCESSING_NAME, 1, job_id)
\ No newline at end of file
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for queue in queues:
+            pipe.zcard(delayed_key(queue))
+        counts = await pipe.execute()
+    return {(queue, "delayed"): count for queue, count in zip(queues, counts)}
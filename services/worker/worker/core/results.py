@@ -0,0 +1,53 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+
+from worker.core.config import settings
+from worker.models.job import Job
+
+REF_PREFIX = "sha256:"
+
+
+def result_path(ref: str) -> Path:
+    digest = ref.removeprefix(REF_PREFIX)
+    return Path(settings.result_store_dir) / digest[:2] / f"{digest}.json.gz"
+
+
+def write_result(data: bytes) -> str:
+    """
+    Content-addressed: the same result bytes are stored once, under their sha256.
+    Written to a temp file and renamed, so readers never see a partial file.
+    """
+    ref = REF_PREFIX + hashlib.sha256(data).hexdigest()
+    path = result_path(ref)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        with gzip.open(tmp, "wb", compresslevel=6) as f:
+            f.write(data)
+        os.replace(tmp, path)
+    return ref
+
+
+def read_result(ref: str) -> dict:
+    with gzip.open(result_path(ref), "rb") as f:
+        return json.load(f)
+
+
+async def store_result(job: Job, result: dict) -> None:
+    """
+    Sets the job's result: inline in the row when small,
+    otherwise in the result store with only its reference on the row.
+    """
+    data = json.dumps(result, separators=(",", ":")).encode()
+    if len(data) < settings.result_offload_bytes:
+        job.result = result
+        job.result_ref = None
+        return
+
+    job.result = None
+    job.result_ref = await asyncio.to_thread(write_result, data)
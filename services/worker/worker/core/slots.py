@@ -0,0 +1,28 @@
+import asyncio
+
+
+class Slots:
+    """
+    A semaphore whose size can change while slots are held (see worker.autoscaler).
+    Growing lets the waiter in at once; shrinking takes effect as held slots are released,
+    running jobs are never interrupted. A single waiter (worker_loop) is assumed.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.in_use = 0
+        self._changed = asyncio.Event()
+
+    async def acquire(self) -> None:
+        while self.in_use >= self.limit:
+            self._changed.clear()
+            await self._changed.wait()
+        self.in_use += 1
+
+    def release(self) -> None:
+        self.in_use -= 1
+        self._changed.set()
+
+    def resize(self, limit: int) -> None:
+        self.limit = limit
+        self._changed.set()
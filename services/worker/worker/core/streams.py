@@ -0,0 +1,189 @@
+import os
+import time
+
+from redis.exceptions import ResponseError
+
+from worker.core.redis import DEFAULT_QUEUE, delayed_key, redis_client
+
+STREAM_NAME = os.getenv("STREAM_NAME", "jobrunner:stream")
+STREAM_GROUP = os.getenv("STREAM_GROUP", "jobrunner")
+STREAM_HELD_NAME = os.getenv("STREAM_HELD_NAME", "jobrunner:stream-held")
+
+# (stream key, entry id, job id as written by the producer)
+Entry = tuple[str, str, str]
+
+def stream_key(queue: str) -> str:
+    return STREAM_NAME if queue == DEFAULT_QUEUE else f"{STREAM_NAME}:{queue}"
+
+# streams whose consumer group this process already created (or found)
+_groups: set[str] = set()
+
+async def ensure_group(key: str) -> None:
+    """
+        Creates the consumer group (and the stream) on first use. Reading from id 0,
+        so entries added before the group existed are still delivered.
+        """
+    if key in _groups:
+        return
+    try:
+        await redis_client.xgroup_create(key, STREAM_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+    _groups.add(key)
+
+def _entries(key: str, messages) -> list[Entry]:
+    # an entry deleted while pending comes back without fields: hand out its id, which fails
+    # the job id check and gets acked away as a bad message
+    return [(key, entry_id, (fields or {}).get("job_id") or entry_id) for entry_id, fields in messages]
+
+async def read_entries(queue: str, consumer: str, count: int, block_seconds: float | None = None) -> list[Entry]:
+    """
+        XREADGROUP of up to count new entries of one queue, delivered to consumer
+        (they stay in the group's pending entries list until acked).
+        Waits up to block_seconds for the first one, if given.
+        """
+    key = stream_key(queue)
+    await ensure_group(key)
+    block = None if block_seconds is None else max(1, int(block_seconds * 1000))
+    try:
+        res = await redis_client.xreadgroup(STREAM_GROUP, consumer, {key: ">"}, count=count, block=block)
+    except ResponseError as e:
+        if "NOGROUP" not in str(e):
+            raise
+        # stream deleted under us (e.g. FLUSHDB): recreate on the next read
+        _groups.discard(key)
+        return []
+    return [entry for _key, messages in res or [] for entry in _entries(key, messages)]
+
+async def claim_stale_entries(queue: str, consumer: str, min_idle_seconds: float, count: int) -> list[Entry]:
+    """
+        Takes over up to count entries of one queue that were delivered but neither acked
+        nor renewed for min_idle_seconds, i.e. whose consumer died or stalled.
+        XPENDING ... IDLE finds them wherever they sit in the pending entries list (XAUTOCLAIM
+        would only look at the first 10 * count entries per call); XCLAIM re-checks the idle
+        time, so two workers can't both take the same entry.
+        """
+    key = stream_key(queue)
+    await ensure_group(key)
+    min_idle_ms = int(min_idle_seconds * 1000)
+    stale = await redis_client.xpending_range(key, STREAM_GROUP, min="-", max="+", count=count, idle=min_idle_ms)
+    if not stale:
+        return []
+    messages = await redis_client.xclaim(
+        key, STREAM_GROUP, consumer, min_idle_ms, [entry["message_id"] for entry in stale]
+    )
+    return [entry for entry in _entries(key, messages) if entry[1]]
+
+async def ack_entries(entries: dict[str, list[str]]) -> None:
+    """
+        XACK (O(1) per entry) and XDEL, so streams only hold undelivered and in-flight work.
+        entries: stream key -> [entry id]
+        """
+    entries = {key: ids for key, ids in entries.items() if ids}
+    if not entries:
+        return
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key, ids in entries.items():
+            pipe.xack(key, STREAM_GROUP, *ids)
+            pipe.xdel(key, *ids)
+        await pipe.execute()
+
+async def renew_entries(consumer: str, entries: dict[str, list[str]], min_idle_seconds: float) -> None:
+    """
+        Resets the idle time of this consumer's in-flight entries (XCLAIM ... JUSTID), so
+        claim_stale_entries() leaves them alone. Only entries idle for min_idle_seconds are touched:
+        one that another consumer took over moments ago is not taken back.
+        entries: stream key -> [entry id]
+        """
+    entries = {key: ids for key, ids in entries.items() if ids}
+    if not entries:
+        return
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for key, ids in entries.items():
+            pipe.xclaim(key, STREAM_GROUP, consumer, int(min_idle_seconds * 1000), ids, justid=True)
+        await pipe.execute()
+
+async def pending_summary(queue: str) -> tuple[int, int | None, float]:
+    """
+        (entries delivered but not acked, entries not delivered yet (None before Redis 7),
+        seconds since the oldest pending entry was last delivered or renewed).
+        """
+    key = stream_key(queue)
+    await ensure_group(key)
+    groups = await redis_client.xinfo_groups(key)
+    group = next((g for g in groups if g["name"] == STREAM_GROUP), None)
+    if group is None:
+        return 0, None, 0.0
+    oldest = await redis_client.xpending_range(key, STREAM_GROUP, min="-", max="+", count=1)
+    idle = oldest[0]["time_since_delivered"] / 1000 if oldest else 0.0
+    return int(group["pending"]), group.get("lag"), idle
+
+# KEYS[1] is the held set, KEYS[2] the stream; ARGV holds (member, job_id) pairs.
+# For each pair still held: drop it from the held set and XADD the job id.
+# A member already gone was pushed by someone else (the committing worker or the recovery loop).
+_push_held = redis_client.register_script("""
+local pushed = 0
+for i = 1, #ARGV, 2 do
+    if redis.call('ZREM', KEYS[1], ARGV[i]) == 1 then
+        redis.call('XADD', KEYS[2], '*', 'job_id', ARGV[i + 1])
+        pushed = pushed + 1
+    end
+end
+return pushed
+""")
+
+def _held_member(queue: str, job_id: str) -> str:
+    # queue names can't contain spaces (see the API's JobCreate), job ids are UUIDs
+    return f"{job_id} {queue}"
+
+async def hold_job_ids(job_ids_by_queue: dict[str, list[str]], lease_seconds: float) -> None:
+    """
+        Records ids of jobs about to be committed (e.g. child jobs) with a deadline, so
+        push_expired_held() adds them to their stream if the worker dies before push_held_job_ids().
+        """
+    expires = time.time() + lease_seconds
+    members = {
+        _held_member(queue, job_id): expires for queue, job_ids in job_ids_by_queue.items() for job_id in job_ids
+    }
+    if members:
+        await redis_client.zadd(STREAM_HELD_NAME, members)
+
+async def push_held_job_ids(job_ids_by_queue: dict[str, list[str]]) -> int:
+    pushed = 0
+    for queue, job_ids in job_ids_by_queue.items():
+        if job_ids:
+            args = [arg for job_id in job_ids for arg in (_held_member(queue, job_id), job_id)]
+            pushed += int(await _push_held(keys=[STREAM_HELD_NAME, stream_key(queue)], args=args))
+    return pushed
+
+async def push_expired_held(now: float, limit: int) -> int:
+    """
+        Pushes up to limit held ids whose deadline passed. Their jobs may not exist (the transaction
+        rolled back): the claim then finds nothing and the entry is acked away.
+        """
+    members = await redis_client.zrangebyscore(STREAM_HELD_NAME, "-inf", now, start=0, num=limit)
+    by_queue: dict[str, list[str]] = {}
+    for member in members:
+        job_id, _, queue = member.partition(" ")
+        by_queue.setdefault(queue, []).append(job_id)
+    await push_held_job_ids(by_queue)
+    return len(members)
+
+# Moves up to ARGV[2] ids with score <= ARGV[1] from the delayed set (KEYS[1]) to the stream (KEYS[2]).
+_promote_due = redis_client.register_script("""
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+if #ids > 0 then
+    redis.call('ZREM', KEYS[1], unpack(ids))
+    for _, job_id in ipairs(ids) do
+        redis.call('XADD', KEYS[2], '*', 'job_id', job_id)
+    end
+end
+return #ids
+""")
+
+async def promote_due_retries(queue: str, now: float, limit: int) -> int:
+    """
+        Same as worker.core.redis.promote_due_retries(), into the queue's stream.
+        """
+    return int(await _promote_due(keys=[delayed_key(queue), stream_key(queue)], args=[now, limit]))
@@ -0,0 +1,149 @@
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator
+
+from worker.core.config import settings
+
+try:
+    from opentelemetry import propagate, trace
+    from opentelemetry.context import Context
+    from opentelemetry.trace import Link
+except ImportError:  # optional: pip install .[tracing]
+    trace = None
+
+log = logging.getLogger("worker")
+
+_tracer = None
+
+
+def setup_tracing() -> None:
+    """
+    Exports spans when settings.tracing_exporter is set:
+    - otlp: to a collector, configured by the standard OTEL_EXPORTER_OTLP_* variables
+    - file: one JSON span per line, appended to settings.tracing_file_path
+    SQL (SQLAlchemy) and Redis calls get spans of their own; jobs continue the trace
+    stored in jobs.trace_context by the API.
+    """
+    global _tracer
+    if settings.tracing_exporter == "none":
+        return
+    try:
+        from opentelemetry.instrumentation.redis import RedisInstrumentor
+        from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as e:
+        raise RuntimeError("TRACING_EXPORTER is set but OpenTelemetry is not installed (pip install .[tracing])") from e
+
+    from worker.db.session import engine
+
+    provider = TracerProvider(resource=Resource.create({"service.name": "jobrunner-worker"}))
+    provider.add_span_processor(BatchSpanProcessor(make_exporter()))
+    trace.set_tracer_provider(provider)
+    SQLAlchemyInstrumentor().instrument(engine=engine.sync_engine)
+    RedisInstrumentor().instrument()
+
+    # trace_id / span_id on every JSON log line written inside a span
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(TraceContextFilter())
+
+    _tracer = trace.get_tracer("jobrunner.worker")
+    log.info("tracing_enabled", extra={"exporter": settings.tracing_exporter})
+
+
+def make_exporter():
+    if settings.tracing_exporter == "file":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        out = open(settings.tracing_file_path, "a", encoding="utf-8")
+        return ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + "\n")
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+    return OTLPSpanExporter()
+
+
+class TraceContextFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        span_context = trace.get_current_span().get_span_context()
+        if span_context.is_valid:
+            record.trace_id = format(span_context.trace_id, "032x")
+            record.span_id = format(span_context.span_id, "016x")
+        return True
+
+
+def _job_context(job):
+    """
+    The parent of a job's spans: the API span that created it (W3C traceparent in jobs.trace_context).
+    A job without one (API tracing off, or created before the column existed) gets its own trace once:
+    a root span from its creation to now, stored on the row, so its claim commits it and all its spans,
+    later attempts included, share that trace.
+    """
+    if job.trace_context is None:
+        root = _tracer.start_span(
+            "job",
+            context=Context(),
+            links=_links(),
+            attributes=_job_attributes(job),
+            start_time=_ns(job.created_at) if job.created_at is not None else None,
+        )
+        root.end()
+        carrier: dict[str, str] = {}
+        propagate.inject(carrier, context=trace.set_span_in_context(root))
+        job.trace_context = carrier
+    return propagate.extract(job.trace_context)
+
+
+def _job_attributes(job) -> dict:
+    return {"job.id": str(job.id), "job.type": job.type, "job.queue": job.queue, "job.attempt": job.attempts}
+
+
+def _links() -> list:
+    # from a job's spans to the batch span it ran in, which holds the batch's SQL and Redis spans
+    span_context = trace.get_current_span().get_span_context()
+    return [Link(span_context)] if span_context.is_valid else []
+
+
+def _ns(value: datetime | int) -> int:
+    return int(value.timestamp() * 1e9) if isinstance(value, datetime) else value
+
+
+@contextmanager
+def batch_span(job_ids: list[str]) -> Iterator[None]:
+    """
+    One span per reserved batch: claims, commit and acks are shared by its jobs.
+    """
+    if _tracer is None:
+        yield
+        return
+    with _tracer.start_as_current_span("worker.batch", attributes={"job.count": len(job_ids)}):
+        yield
+
+
+@contextmanager
+def job_span(name: str, job) -> Iterator[None]:
+    """
+    A span in the job's own trace, current while the block runs (handler SQL / Redis calls nest under it).
+    """
+    if _tracer is None:
+        yield
+        return
+    with _tracer.start_as_current_span(
+            name, context=_job_context(job), links=_links(), attributes=_job_attributes(job)
+    ):
+        yield
+
+
+def record_job_span(name: str, job, start: datetime | int, end: datetime | int) -> None:
+    """
+    An already finished span in the job's trace (start / end: datetime or epoch ns),
+    for the job's share of batch-wide steps (claim, commit, ack) and for its time in the queue.
+    """
+    if _tracer is None:
+        return
+    span = _tracer.start_span(
+        name, context=_job_context(job), links=_links(), attributes=_job_attributes(job), start_time=_ns(start)
+    )
+    span.end(end_time=_ns(end))
@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import select
+from sqlalchemy import any_, bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from worker.models.job import Job, JobStatus
@@ -26,9 +27,58 @@ async def claim_job_by_id(db: AsyncSession, job_id: str) -> Job | None:
 
     job.status = JobStatus.running
     job.attempts += 1
+    job.lease_expires_at = None
     if job.started_at is None:
         job.started_at = now
     job.updated_at = now
 
     await db.flush()
-    return job
\ No newline at end of file
+    return job
+
+def unclaim_job(job: Job) -> None:
+    """
+        Undoes a claim inside the same transaction, for a job that will not run now.
+        Both claim paths set started_at and updated_at to the same instant on a first start.
+        """
+    job.status = JobStatus.queued
+    job.attempts -= 1
+    if job.started_at == job.updated_at:
+        job.started_at = None
+
+
+async def claim_jobs_by_ids(db: AsyncSession, job_ids: list[str]) -> list[Job]:
+    """
+        Batch claim in one round trip:
+        UPDATE jobs ... WHERE id IN (ids that are queued, due and not locked) RETURNING *.
+        Ids that are missing, not due or locked by another worker are simply not returned.
+        """
+    now = datetime.now(timezone.utc)
+
+    job_uuids = [uuid.UUID(job_id) for job_id in job_ids]
+    if not job_uuids:
+        return []
+
+    claimable = (
+        select(Job.id)
+        .where(Job.id == any_(bindparam("ids", job_uuids, type_=ARRAY(UUID(as_uuid=True)))))
+        .where(Job.status == JobStatus.queued)
+        .where((Job.run_after.is_(None)) | (Job.run_after <= now))
+        .with_for_update(skip_locked=True)
+    )
+
+    stmt = (
+        update(Job)
+        .where(Job.id.in_(claimable))
+        .values(
+            status=JobStatus.running,
+            attempts=Job.attempts + 1,
+            started_at=func.coalesce(Job.started_at, now),
+            updated_at=now,
+            lease_expires_at=None,
+        )
+        .returning(Job)
+        .execution_options(synchronize_session=False)
+    )
+
+    res = await db.execute(stmt)
+    return list(res.scalars().all())
@@ -3,9 +3,21 @@ from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 
 from worker.core.config import settings
 
+# Connections the loops next to worker_loop hold at most: reaper, sampler, autoscaler, and retention's
+# advisory lock plus its batch. (A slot reserves, runs and NOTIFYs on one connection at a time.)
+BACKGROUND_CONNECTIONS = 5
+
+# the most slots worker_loop can hold: the autoscaler may raise the limit up to autoscale_max_concurrency
+MAX_SLOTS = max(
+    settings.worker_concurrency,
+    settings.autoscale_max_concurrency if settings.autoscale_enabled else 0,
+)
+
 engine: AsyncEngine = create_async_engine(
     settings.database_url,
-    pool_pre_ping=True
+    pool_pre_ping=True,
+    # one connection per slot plus the background loops: a busy slot never waits on the pool
+    pool_size=MAX_SLOTS + BACKGROUND_CONNECTIONS,
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Iterator
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from worker.backends import queue_backend
+from worker.core.config import settings
+from worker.core.metrics import WORKER_JOB_FAILED_TOTAL, WORKER_JOB_SUCCEEDED_TOTAL
+from worker.core.results import read_result, store_result
+from worker.jobs.registry import FanOut, get_reducer, job_input
+from worker.models.job import Job, JobStatus
+
+log = logging.getLogger("worker")
+
+
+async def settle_jobs(
+        db: AsyncSession,
+        jobs: list[Job],
+        fan_outs: list[FanOut | None],
+) -> tuple[list[Job], list[Job]]:
+    """
+    Database follow-ups of executed jobs, one at a time on the caller's session:
+    - a job whose handler returned FanOut gets its child jobs
+    - a child that reached a final status may complete its parent
+    Returns (child jobs created, parents completed). Children are held before the commit;
+    the caller enqueues them after it, see QueueBackend.enqueue_job_ids().
+    """
+    children: list[Job] = []
+    for job, fan_out in zip(jobs, fan_outs):
+        if fan_out is not None:
+            children.extend(spawn_children(db, job, fan_out))
+
+    # fixed lock order, so two batches finishing children of the same parents can't deadlock
+    finished = sorted(
+        (job for job in jobs if job.parent_id is not None and job.status in (JobStatus.succeeded, JobStatus.failed)),
+        key=lambda job: job.parent_id,
+    )
+    parents: list[Job] = []
+    for child in finished:
+        parent = await complete_parent(db, child)
+        if parent is not None:
+            parents.append(parent)
+
+    if children:
+        await db.flush()
+        held: dict[str, list[str]] = {}
+        for child in children:
+            held.setdefault(child.queue, []).append(str(child.id))
+        await queue_backend.hold_job_ids(held, settings.lease_seconds)
+    return children, parents
+
+
+def spawn_children(db: AsyncSession, parent: Job, fan_out: FanOut) -> list[Job]:
+    """
+    The parent stays running, with fan_out.progress as its result, until complete_parent().
+    """
+    now = datetime.now(timezone.utc)
+    parent.result = fan_out.progress
+    parent.updated_at = now
+
+    children = [
+        Job(
+            id=uuid.uuid4(),
+            type=fan_out.child_type,
+            queue=parent.queue,
+            payload=payload,
+            parent_id=parent.id,
+            status=JobStatus.queued,
+            attempts=0,
+            max_attempts=parent.max_attempts,
+            # children's spans join the trace of the request that created the parent
+            trace_context=parent.trace_context,
+        )
+        for payload in fan_out.payloads
+    ]
+    db.add_all(children)
+
+    log.info(
+        "job_fanned_out",
+        extra={"job_id": str(parent.id), "job_type": parent.type, "children": len(children)},
+    )
+    return children
+
+
+async def complete_parent(db: AsyncSession, child: Job) -> Job | None:
+    """
+    Fails the parent as soon as one child fails for good; reduces it once all children succeeded.
+    Returns the parent if this child completed it.
+    Siblings finishing at the same time serialize on the parent's row lock,
+    so exactly one of them sees all the others done.
+    """
+    res = await db.execute(
+        select(Job)
+        .where(Job.id == child.parent_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    parent = res.scalar_one_or_none()
+    if parent is None or parent.status != JobStatus.running:
+        # already completed by a sibling (or deleted)
+        return None
+
+    now = datetime.now(timezone.utc)
+    if child.status == JobStatus.failed:
+        fail_parent(parent, f"child job {child.id} failed: {child.error}", now)
+        return parent
+
+    pending = await db.scalar(
+        select(func.count())
+        .select_from(Job)
+        .where(Job.parent_id == parent.id)
+        .where(Job.status != JobStatus.succeeded)
+    )
+    if pending:
+        return None
+
+    res = await db.execute(select(Job.result, Job.result_ref).where(Job.parent_id == parent.id))
+    rows = res.all()
+
+    reduce = get_reducer(parent.type)
+    try:
+        if reduce is None:
+            raise ValueError(f"No reducer for job type: {parent.type}")
+        # Concept: merging is CPU work (and reads the result store), keep it off the event loop
+        result = await asyncio.to_thread(reduce, job_input(parent), child_results(rows))
+        await store_result(parent, result)
+    except Exception as e:
+        fail_parent(parent, str(e), now)
+        return parent
+
+    parent.status = JobStatus.succeeded
+    parent.succeeded_at = now
+    parent.updated_at = now
+
+    WORKER_JOB_SUCCEEDED_TOTAL.labels(job_type=parent.type).inc()
+    log.info("job_succeeded", extra={"job_id": str(parent.id), "job_type": parent.type, "children": len(rows)})
+    return parent
+
+
+def child_results(rows) -> Iterator[dict]:
+    # one offloaded result in memory at a time
+    for row in rows:
+        yield row.result if row.result_ref is None else read_result(row.result_ref)
+
+
+def fail_parent(parent: Job, error: str, now: datetime) -> None:
+    # not retried: its children already had their own attempts
+    parent.status = JobStatus.failed
+    parent.error = error
+    parent.last_error = error
+    parent.last_error_at = now
+    parent.failed_at = now
+    parent.updated_at = now
+
+    WORKER_JOB_FAILED_TOTAL.labels(job_type=parent.type).inc()
+    log.error("job_failed", extra={"job_id": str(parent.id), "job_type": parent.type, "error": error})
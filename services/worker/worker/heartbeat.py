@@ -0,0 +1,44 @@
+import asyncio
+import logging
+import math
+import os
+import socket
+import time
+import uuid
+
+from worker.core.config import settings
+from worker.core.queues import parse_queues, queue_set_key
+from worker.core.redis import heartbeat
+
+log = logging.getLogger("worker")
+
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+# job ids this process currently holds a lease on
+in_flight_jobs: set[str] = set()
+
+
+async def heartbeat_loop() -> None:
+    """
+    Worker registration + heartbeat.
+    Every heartbeat renews the leases of in-flight jobs, so a long job on a live
+    worker never looks stuck, while a dead worker's jobs expire after lease_seconds.
+    """
+    queue_set = queue_set_key([q.name for q in parse_queues(settings.worker_queues)])
+    info = {
+        "worker_id": WORKER_ID,
+        "queues": queue_set,
+        "host": socket.gethostname(),
+        "pid": os.getpid(),
+        "started_at": time.time(),
+    }
+    # registration outlives a couple of missed beats, not more
+    ttl_seconds = math.ceil(settings.lease_seconds)
+
+    while True:
+        try:
+            await heartbeat(WORKER_ID, info, list(in_flight_jobs), settings.lease_seconds, ttl_seconds, queue_set)
+        except Exception:
+            # keep beating; a missed beat only shortens the remaining lease
+            log.exception("heartbeat_failed", extra={"worker_id": WORKER_ID})
+        await asyncio.sleep(settings.heartbeat_interval_seconds)
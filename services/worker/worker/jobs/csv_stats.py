@@ -0,0 +1,315 @@
+import base64
+import csv
+import hashlib
+import math
+import zlib
+from typing import BinaryIO, Iterable, Iterator, TextIO
+
+import numpy as np
+
+# rows per batch: bounds memory regardless of file size
+CHUNK_ROWS = 20_000
+
+NULL_TOKENS = ("", "NA", "N/A", "NaN", "nan", "null", "NULL", "None")
+
+HLL_PRECISION = 14  # 16384 registers, ~0.8% standard error
+_HLL_REGISTERS = 1 << HLL_PRECISION
+
+
+def hash_strings(values: Iterable[str]) -> np.ndarray:
+    """
+    Stable 64-bit hashes (8-byte BLAKE2b of the UTF-8 bytes), one pass per string, so the cost
+    follows the data, not the longest value. Stable across processes, unlike hash(),
+    so sketches from different workers merge.
+    """
+    digests = b"".join(
+        hashlib.blake2b(value.encode("utf-8", "surrogatepass"), digest_size=8).digest() for value in values
+    )
+    return np.frombuffer(digests, dtype="<u8").astype(np.uint64)
+
+
+class HyperLogLog:
+    """
+    Approximate distinct counter; merging two sketches is an element-wise max.
+    """
+
+    def __init__(self, registers: np.ndarray | None = None) -> None:
+        self.registers = registers if registers is not None else np.zeros(_HLL_REGISTERS, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        index = (hashes >> np.uint64(64 - HLL_PRECISION)).astype(np.intp)
+        rest = hashes << np.uint64(HLL_PRECISION)
+        # rank = leading zeros + 1, taken from the top 32 bits (exact in float64)
+        top = (rest >> np.uint64(32)).astype(np.float64)
+        with np.errstate(divide="ignore"):
+            rank = np.where(top > 0, 32 - np.floor(np.log2(top)), 33).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def to_text(self) -> str:
+        # mostly-empty sketches (low cardinality) compress to almost nothing
+        return base64.b64encode(zlib.compress(self.registers.tobytes())).decode("ascii")
+
+    @classmethod
+    def from_text(cls, text: str) -> "HyperLogLog":
+        return cls(np.frombuffer(zlib.decompress(base64.b64decode(text)), dtype=np.uint8).copy())
+
+    def estimate(self) -> int:
+        m = _HLL_REGISTERS
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # small range: linear counting is more accurate
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+
+class ColumnStats:
+    """
+    Mergeable per-column aggregates. A column is numeric until a non-null value
+    fails to parse as a number; text min/max and distinct counts are kept either way.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.nulls = 0
+        self.numeric = True
+        # numeric moments (Chan et al. parallel variance)
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.num_min: float | None = None
+        self.num_max: float | None = None
+        self.text_min: str | None = None
+        self.text_max: str | None = None
+        self.distinct = HyperLogLog()
+
+    def add_batch(self, values: np.ndarray) -> None:
+        null = np.isin(values, NULL_TOKENS)
+        present = values[~null]
+        self.nulls += int(np.count_nonzero(null))
+        self.count += len(present)
+        if len(present) == 0:
+            return
+
+        unique = np.unique(present)  # sorted, so it also gives text min/max
+        self.text_min = _min_opt(self.text_min, str(unique[0]))
+        self.text_max = _max_opt(self.text_max, str(unique[-1]))
+        self.distinct.add_hashes(hash_strings(unique))
+
+        if not self.numeric:
+            return
+        try:
+            numbers = present.astype(np.float64)
+        except ValueError:
+            self.numeric = False
+            return
+        mean = float(numbers.mean())
+        self._merge_moments(len(numbers), mean, float(np.sum((numbers - mean) ** 2)))
+        self.num_min = _min_opt(self.num_min, float(numbers.min()))
+        self.num_max = _max_opt(self.num_max, float(numbers.max()))
+
+    def merge(self, other: "ColumnStats") -> None:
+        self.count += other.count
+        self.nulls += other.nulls
+        self.text_min = _min_opt(self.text_min, other.text_min)
+        self.text_max = _max_opt(self.text_max, other.text_max)
+        self.distinct.merge(other.distinct)
+
+        self.numeric = self.numeric and other.numeric
+        if self.numeric and other.n:
+            self._merge_moments(other.n, other.mean, other.m2)
+            self.num_min = _min_opt(self.num_min, other.num_min)
+            self.num_max = _max_opt(self.num_max, other.num_max)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "nulls": self.nulls,
+            "numeric": self.numeric,
+            "n": self.n,
+            "mean": self.mean,
+            "m2": self.m2,
+            "num_min": self.num_min,
+            "num_max": self.num_max,
+            "text_min": self.text_min,
+            "text_max": self.text_max,
+            "distinct": self.distinct.to_text(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ColumnStats":
+        stats = cls()
+        for name in ("count", "nulls", "numeric", "n", "mean", "m2", "num_min", "num_max", "text_min", "text_max"):
+            setattr(stats, name, data[name])
+        stats.distinct = HyperLogLog.from_text(data["distinct"])
+        return stats
+
+    def _merge_moments(self, n: int, mean: float, m2: float) -> None:
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+
+    def summary(self) -> dict:
+        out: dict = {
+            "type": "numeric" if self.numeric and self.n else "text",
+            "count": self.count,
+            "nulls": self.nulls,
+            "approx_distinct": self.distinct.estimate(),
+        }
+        if out["type"] == "numeric":
+            out.update(
+                min=self.num_min,
+                max=self.num_max,
+                mean=self.mean,
+                stddev=math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0,
+            )
+        else:
+            out.update(min=self.text_min, max=self.text_max)
+        return out
+
+
+def _min_opt(a, b):
+    return b if a is None else a if b is None else min(a, b)
+
+
+def _max_opt(a, b):
+    return b if a is None else a if b is None else max(a, b)
+
+
+class CsvSummary:
+    def __init__(self, columns: list[str]) -> None:
+        self.columns = columns
+        self.rows = 0
+        self.stats = [ColumnStats() for _ in columns]
+
+    def add_rows(self, rows: list[list[str]]) -> None:
+        """
+        One batch: transpose to columns and aggregate each column with numpy.
+        Ragged rows are padded with nulls / truncated to the header width.
+        Columns are object arrays of the parsed strings: a fixed-width unicode array would
+        size every cell of a chunk like its longest one.
+        """
+        if not rows:
+            return
+        width = len(self.columns)
+        rows = [row[:width] + [""] * (width - len(row)) if len(row) != width else row for row in rows]
+        for stats, values in zip(self.stats, zip(*rows)):
+            stats.add_batch(np.array(values, dtype=object))
+        self.rows += len(rows)
+
+    def merge(self, other: "CsvSummary") -> None:
+        self.rows += other.rows
+        for stats, other_stats in zip(self.stats, other.stats):
+            stats.merge(other_stats)
+
+    def to_dict(self) -> dict:
+        """
+        Full mergeable state (unlike summary()), e.g. for a partial result of one byte range.
+        """
+        return {"columns": self.columns, "rows": self.rows, "stats": [stats.to_dict() for stats in self.stats]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CsvSummary":
+        summary = cls(data["columns"])
+        summary.rows = data["rows"]
+        summary.stats = [ColumnStats.from_dict(stats) for stats in data["stats"]]
+        return summary
+
+    def summary(self) -> dict:
+        return {
+            "rows": self.rows,
+            "columns": {name: stats.summary() for name, stats in zip(self.columns, self.stats)},
+        }
+
+
+def chunked(rows: Iterable[list[str]], size: int = CHUNK_ROWS) -> Iterable[list[list[str]]]:
+    chunk: list[list[str]] = []
+    for row in rows:
+        if not row:
+            continue  # blank line
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def summarize_csv(f: TextIO, delimiter: str = ",", has_header: bool = True) -> CsvSummary:
+    """
+    Streams a CSV file in CHUNK_ROWS batches; memory stays flat whatever the file size.
+    """
+    reader = csv.reader(f, delimiter=delimiter)
+    first = next(reader, None)
+    if first is None:
+        return CsvSummary([])
+
+    if has_header:
+        summary = CsvSummary(first)
+    else:
+        summary = CsvSummary([f"col_{i}" for i in range(len(first))])
+        summary.add_rows([first])
+
+    for chunk in chunked(reader):
+        summary.add_rows(chunk)
+    return summary
+
+
+def read_header(f: BinaryIO, delimiter: str = ",", has_header: bool = True) -> tuple[list[str], int]:
+    """
+    Column names and the byte offset where data rows start.
+    """
+    f.seek(0)
+    first = f.readline()
+    fields = next(csv.reader([first.decode("utf-8", errors="replace")], delimiter=delimiter), [])
+    if has_header:
+        return fields, f.tell()
+    return [f"col_{i}" for i in range(len(fields))], 0
+
+
+def line_ranges(f: BinaryIO, start: int, end: int, chunk_bytes: int) -> list[tuple[int, int]]:
+    """
+    Splits bytes [start, end) into ranges of about chunk_bytes, each ending right after a line break.
+    Assumes quoted fields contain no line breaks: a split inside one would cut that row in two.
+    """
+    ranges = []
+    while start < end:
+        stop = start + chunk_bytes
+        if stop >= end:
+            stop = end
+        else:
+            f.seek(stop)
+            f.readline()  # finish the line we landed in
+            stop = min(f.tell(), end)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def _range_lines(f: BinaryIO, start: int, end: int) -> Iterator[str]:
+    f.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        line = f.readline()
+        if not line:
+            return
+        remaining -= len(line)
+        yield line.decode("utf-8", errors="replace")
+
+
+def summarize_csv_range(f: BinaryIO, start: int, end: int, columns: list[str], delimiter: str = ",") -> CsvSummary:
+    """
+    summarize_csv() for the rows in bytes [start, end) of a file, see line_ranges().
+    """
+    summary = CsvSummary(columns)
+    for chunk in chunked(csv.reader(_range_lines(f, start, end), delimiter=delimiter)):
+        summary.add_rows(chunk)
+    return summary
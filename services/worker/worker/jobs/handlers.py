@@ -1,10 +1,97 @@
 import asyncio
-from worker.models.job import Job
+import os
+from pathlib import Path
+from typing import Iterable
 
-async def handle_csv_summary(job: Job) -> dict:
-    await asyncio.sleep(0.2)
+from worker.core.config import settings
+from worker.jobs.csv_stats import CsvSummary, line_ranges, read_header, summarize_csv, summarize_csv_range
+from worker.jobs.registry import FanOut, JobInput, handler, reducer
+
+
+def resolve_data_file(name: str) -> Path:
+    """
+    Payload file names are relative to settings.data_dir and may not escape it.
+    """
+    root = Path(settings.data_dir).resolve()
+    path = (root / name).resolve()
+    if not path.is_relative_to(root):
+        raise ValueError(f"file must be inside the data directory: {name}")
+    return path
+
+
+# CPU-bound: numpy over CHUNK_ROWS batches, run in the process pool
+@handler("csv_summary", timeout_seconds=600, max_concurrency=4, mode="process")
+def handle_csv_summary(job: JobInput) -> dict | FanOut:
+    """
+    payload: file, delimiter (","), has_header (true),
+    parallel (false): split the file into csv_summary_partial jobs of chunk_bytes
+    (settings.csv_chunk_bytes) each, so any free worker can take a part.
+    """
     file_name = job.payload.get("file", "unknown.csv")
-    return { "message": "csv_summary completed", "file": file_name, "rows": 0 }
+    path = resolve_data_file(file_name)
+    delimiter = job.payload.get("delimiter", ",")
+    has_header = job.payload.get("has_header", True)
+
+    chunk_bytes = job.payload.get("chunk_bytes", settings.csv_chunk_bytes)
+    if job.payload.get("parallel") and os.path.getsize(path) > chunk_bytes:
+        with open(path, "rb") as f:
+            columns, data_start = read_header(f, delimiter, has_header)
+            ranges = line_ranges(f, data_start, os.path.getsize(path), chunk_bytes)
+        if len(ranges) > 1:
+            payloads = [
+                {"file": file_name, "start": start, "end": end, "columns": columns, "delimiter": delimiter}
+                for start, end in ranges
+            ]
+            return FanOut(
+                child_type="csv_summary_partial",
+                payloads=payloads,
+                progress={"message": "csv_summary running", "file": file_name, "parts": len(payloads)},
+            )
+
+    with open(path, newline="", encoding="utf-8", errors="replace") as f:
+        summary = summarize_csv(f, delimiter=delimiter, has_header=has_header)
+
+    return {"message": "csv_summary completed", "file": file_name, **summary.summary()}
+
+@handler("csv_summary_partial", timeout_seconds=600, max_concurrency=4, mode="process")
+def handle_csv_summary_partial(job: JobInput) -> dict:
+    """
+    One byte range of a parallel csv_summary; returns mergeable state, not a summary.
+    """
+    path = resolve_data_file(job.payload["file"])
+    with open(path, "rb") as f:
+        summary = summarize_csv_range(
+            f,
+            job.payload["start"],
+            job.payload["end"],
+            job.payload["columns"],
+            delimiter=job.payload.get("delimiter", ","),
+        )
+    return summary.to_dict()
+
+@reducer("csv_summary")
+def reduce_csv_summary(job: JobInput, results: Iterable[dict]) -> dict:
+    summary: CsvSummary | None = None
+    for result in results:
+        part = CsvSummary.from_dict(result)
+        if summary is None:
+            summary = part
+        else:
+            summary.merge(part)
+    if summary is None:
+        raise ValueError("csv_summary has no parts to merge")
+    return {"message": "csv_summary completed", "file": job.payload.get("file", "unknown.csv"), **summary.summary()}
+
+@handler("always_fail")
+async def handle_always_fail(job: JobInput) -> dict:
+    raise RuntimeError("Intentional failure for retry testing")
 
-async def handle_always_fail(job: Job) -> dict:
-    raise RuntimeError("Intentional failure for retry testing")
\ No newline at end of file
+@handler("noop")
+async def handle_noop(job: JobInput) -> dict:
+    """
+    Does nothing (or sleeps payload sleep_ms): measures the queue's own overhead, see bench/loadgen.py.
+    """
+    sleep_ms = job.payload.get("sleep_ms", 0)
+    if sleep_ms:
+        await asyncio.sleep(sleep_ms / 1000)
+    return {}
@@ -0,0 +1,117 @@
+import asyncio
+import multiprocessing
+import pickle
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection
+from typing import Any, Callable
+
+
+class HandlerError(RuntimeError):
+    """
+    A handler raised inside its process; carries "ExceptionType: message".
+    """
+
+
+class HandlerProcessDied(RuntimeError):
+    """
+    The process running a handler exited before returning a result.
+    """
+
+
+def _dumps(obj: Any) -> bytes:
+    return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _serve(conn: Connection) -> None:
+    """
+    Child process loop: one (func, job) in, one (ok, result or error) out.
+    """
+    # Ctrl-C reaches the whole process group; the parent decides when we stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            func, job = pickle.loads(conn.recv_bytes())
+        except EOFError:
+            return
+
+        try:
+            reply = _dumps((True, func(job)))
+        except Exception as e:
+            reply = _dumps((False, f"{type(e).__name__}: {e}"))
+        conn.send_bytes(reply)
+
+
+class _Child:
+    def __init__(self, ctx) -> None:
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_serve, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def stop(self) -> int | None:
+        # closing the pipe is left to GC: an I/O thread may still be reading from it
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        return self.process.exitcode
+
+    def retire(self) -> None:
+        # idle, so nobody is reading: closing the pipe ends the child's loop
+        self.conn.close()
+        self.process.join(timeout=5)
+        self.stop()
+
+
+class ProcessPool:
+    """
+    Pre-forked processes for CPU-bound handlers, one job per process at a time.
+    - payload and result travel as one pickled message each over the process's own pipe
+    - a crash only loses that process: it is replaced and the job fails with HandlerProcessDied
+    - on timeout or cancellation the process is killed (the only way to stop a running
+      handler) and replaced
+    - max_tasks_per_child > 0 recycles processes to cap slow memory growth
+    """
+
+    def __init__(self, size: int, max_tasks_per_child: int = 0) -> None:
+        # spawn, not fork: forking a process that runs an event loop and I/O threads is unsafe
+        self._ctx = multiprocessing.get_context("spawn")
+        self._max_tasks_per_child = max_tasks_per_child
+        self._idle: asyncio.Queue[_Child] = asyncio.Queue()
+        for _ in range(size):
+            self._idle.put_nowait(_Child(self._ctx))
+        # a blocking recv per busy process, off the event loop
+        self._io = ThreadPoolExecutor(max_workers=size, thread_name_prefix="process-pool-io")
+
+    async def run(self, func: Callable[[Any], Any], job: Any) -> Any:
+        child = await self._idle.get()
+        loop = asyncio.get_running_loop()
+        try:
+            child.conn.send_bytes(_dumps((func, job)))
+            ok, value = pickle.loads(await loop.run_in_executor(self._io, child.conn.recv_bytes))
+        except (EOFError, OSError):
+            exitcode = child.stop()
+            self._idle.put_nowait(_Child(self._ctx))
+            raise HandlerProcessDied(f"handler process died (exit code {exitcode})") from None
+        except BaseException:
+            child.stop()
+            self._idle.put_nowait(_Child(self._ctx))
+            raise
+
+        self._release(child)
+        if not ok:
+            raise HandlerError(value)
+        return value
+
+    def _release(self, child: _Child) -> None:
+        child.tasks += 1
+        if self._max_tasks_per_child and child.tasks >= self._max_tasks_per_child:
+            child.retire()
+            child = _Child(self._ctx)
+        self._idle.put_nowait(child)
+
+    def close(self) -> None:
+        while not self._idle.empty():
+            self._idle.get_nowait().retire()
+        self._io.shutdown(wait=False)
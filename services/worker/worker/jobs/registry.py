@@ -0,0 +1,180 @@
+import asyncio
+import enum
+import os
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Iterable
+
+from worker.core.config import settings
+from worker.jobs.process_pool import ProcessPool
+
+if TYPE_CHECKING:
+    from worker.models.job import Job
+
+
+class ExecutionMode(str, enum.Enum):
+    async_ = "async"      # coroutine on the worker's event loop (I/O-bound)
+    thread = "thread"     # plain function in the default thread pool (blocking I/O, C extensions)
+    process = "process"   # plain function in a process pool (CPU-bound)
+
+
+@dataclass(frozen=True)
+class JobInput:
+    """
+    What a handler gets to see of its job: a detached, picklable snapshot,
+    so the same handler runs in any execution mode.
+    """
+    id: str
+    type: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+
+
+def job_input(job: "Job") -> JobInput:
+    return JobInput(
+        id=str(job.id),
+        type=job.type,
+        payload=job.payload,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+    )
+
+
+@dataclass(frozen=True)
+class FanOut:
+    """
+    Returned by a handler to split its job into child jobs instead of finishing it.
+    The job stays running until its children are done, then the reducer registered
+    for its type builds the result from theirs (see @reducer).
+    """
+    child_type: str
+    payloads: list[dict]
+    # the parent's result while its children run
+    progress: dict = field(default_factory=dict)
+
+
+@dataclass
+class HandlerSpec:
+    job_type: str
+    func: Callable[[JobInput], Any]
+    timeout_seconds: float | None = None
+    max_concurrency: int | None = None
+    mode: ExecutionMode = ExecutionMode.async_
+    limit: asyncio.Semaphore | None = field(default=None, repr=False)
+
+
+_handlers: dict[str, HandlerSpec] = {}
+_reducers: dict[str, Callable[[JobInput, Iterable[dict]], dict]] = {}
+_process_pool: ProcessPool | None = None
+
+
+def handler(
+        job_type: str,
+        *,
+        timeout_seconds: float | None = None,
+        max_concurrency: int | None = None,
+        mode: ExecutionMode | str = ExecutionMode.async_,
+):
+    """
+    Registers a handler for a job type:
+
+        @handler("csv_summary", timeout_seconds=600, max_concurrency=2, mode="process")
+        def handle_csv_summary(job: JobInput) -> dict: ...
+    """
+    mode = ExecutionMode(mode)
+
+    def register(func: Callable[[JobInput], Any]) -> Callable[[JobInput], Any]:
+        if job_type in _handlers:
+            raise ValueError(f"Handler already registered for job type: {job_type}")
+        if mode == ExecutionMode.async_ and not asyncio.iscoroutinefunction(func):
+            raise TypeError(f"Handler for {job_type} must be async in {mode.value} mode")
+        if mode != ExecutionMode.async_ and asyncio.iscoroutinefunction(func):
+            raise TypeError(f"Handler for {job_type} must be a plain function in {mode.value} mode")
+
+        _handlers[job_type] = HandlerSpec(
+            job_type=job_type,
+            func=func,
+            timeout_seconds=timeout_seconds,
+            max_concurrency=max_concurrency,
+            mode=mode,
+            limit=asyncio.Semaphore(max_concurrency) if max_concurrency else None,
+        )
+        return func
+
+    return register
+
+
+def reducer(job_type: str):
+    """
+    Registers how a fanned-out job of this type combines its children's results:
+
+        @reducer("csv_summary")
+        def reduce_csv_summary(job: JobInput, results: Iterable[dict]) -> dict: ...
+
+    results yields each child's result once, loading offloaded ones as it goes.
+    Runs in a thread of the worker that finishes the last child.
+    """
+    def register(func: Callable[[JobInput, Iterable[dict]], dict]) -> Callable[[JobInput, Iterable[dict]], dict]:
+        if job_type in _reducers:
+            raise ValueError(f"Reducer already registered for job type: {job_type}")
+        _reducers[job_type] = func
+        return func
+
+    return register
+
+
+def get_handler(job_type: str) -> HandlerSpec | None:
+    return _handlers.get(job_type)
+
+
+def get_reducer(job_type: str) -> Callable[[JobInput, Iterable[dict]], dict] | None:
+    return _reducers.get(job_type)
+
+
+def at_capacity(spec: HandlerSpec) -> bool:
+    """
+    True when max_concurrency jobs of this type are already running in this process.
+    Checked right before run_handler() with no await in between, so check and acquire can't race.
+    """
+    return spec.limit is not None and spec.limit.locked()
+
+
+async def run_handler(spec: HandlerSpec, job: JobInput) -> dict | FanOut:
+    """
+    Runs the handler in its execution mode, under its per-type limit and timeout.
+    """
+    if spec.limit is None:
+        return await _run_with_timeout(spec, job)
+    async with spec.limit:
+        return await _run_with_timeout(spec, job)
+
+
+async def _run_with_timeout(spec: HandlerSpec, job: JobInput) -> dict:
+    # note: a timed-out thread keeps running in the background, it just stops being awaited;
+    # a timed-out process handler is killed by the pool
+    try:
+        return await asyncio.wait_for(_invoke(spec, job), timeout=spec.timeout_seconds)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"{spec.job_type} handler timed out after {spec.timeout_seconds}s") from None
+
+
+async def _invoke(spec: HandlerSpec, job: JobInput) -> dict:
+    if spec.mode == ExecutionMode.async_:
+        return await spec.func(job)
+    if spec.mode == ExecutionMode.thread:
+        return await asyncio.to_thread(spec.func, job)
+
+    return await process_pool().run(spec.func, job)
+
+
+def process_pool() -> ProcessPool:
+    """
+    Started on first use, so workers without process-mode handlers never fork anything.
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPool(
+            size=settings.process_pool_size or os.cpu_count() or 1,
+            max_tasks_per_child=settings.process_pool_max_tasks_per_child,
+        )
+    return _process_pool
@@ -1,4 +1,3 @@
-import json
 import logging
 import asyncio
 import uuid
@@ -7,31 +6,110 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from prometheus_client import start_http_server
 
 from worker.core.config import settings
-from worker.core.redis import redis_client, QUEUE_NAME, reserve_job_id, ack_job_id
+from worker.backends import queue_backend
+from worker.core.queues import QueueSelector, parse_queues
 from worker.db.session import AsyncSessionLocal
-from worker.db.claim import claim_job_by_id
-from worker.jobs.handlers import handle_csv_summary, handle_always_fail
-from worker.models.job import JobStatus
+from worker.db.claim import claim_job_by_id, claim_jobs_by_ids, unclaim_job
+import worker.jobs.handlers  # noqa: F401  (registers the job handlers)
+from worker.jobs.registry import FanOut, at_capacity, get_handler, job_input, run_handler
+from worker.models.job import Job, JobStatus
 from worker.core.logging import setup_logging
+from worker.core.tracing import batch_span, job_span, record_job_span, setup_tracing
 from worker.core.metrics import (
     WORKER_JOB_CLAIMED_TOTAL,
     WORKER_JOB_DURATION_SECONDS,
     WORKER_JOB_SUCCEEDED_TOTAL,
     WORKER_JOB_FAILED_TOTAL,
     WORKER_JOB_RETRY_SCHEDULED_TOTAL,
+    WORKER_JOB_DEFERRED_TOTAL,
+    WORKER_JOB_QUEUE_WAIT_SECONDS,
+    WORKER_STAGE_DURATION_SECONDS,
 )
 from worker.core.retry import compute_backoff_seconds
+from worker.core.results import store_result
 import time
-from worker.reaper import requeue_stuck_jobs
+from worker.retention import enforce_retention
+from worker.sampler import sample_queue_metrics
+from worker.autoscaler import autoscale_concurrency, record_batch, worker_slots
+from worker.heartbeat import in_flight_jobs
+from worker.fanout import settle_jobs
 
 log = logging.getLogger("worker")
 
 
-async def process_job(db: AsyncSession, job_id: str) -> None:
+async def process_job(db: AsyncSession, job_id: str) -> tuple[list[Job], list[Job]]:
+    """
+        Returns (jobs whose status changed: the claimed one and any parent it completed,
+        child jobs created by a fan-out).
+        """
+    started = time.perf_counter()
+    claiming = time.time_ns()
     job = await claim_job_by_id(db, job_id)
+    WORKER_STAGE_DURATION_SECONDS.labels(stage="claim").observe(time.perf_counter() - started)
     if job is None:
         # Concept: job can be missing/finished; queue is “at least once”
         log.info("job_not_claimed", extra={"job_id": job_id})
+        return [], []
+
+    # a slow claim is a row lock wait (or a slow UPDATE), not the handler: its own span
+    record_job_span("job.claim", job, claiming, time.time_ns())
+    observe_queue_wait([job])
+    fan_out = await execute_job(job)
+    children, parents = await settle_jobs(db, [job], [fan_out])
+    return [job, *parents], children
+
+
+async def process_batch(db: AsyncSession, job_ids: list[str]) -> tuple[list[Job], list[Job]]:
+    """
+        Claims all ids with one UPDATE ... RETURNING and runs their handlers concurrently.
+        Everything commits in the caller's single transaction.
+        Returns the same pair as process_job().
+        """
+    started = time.perf_counter()
+    claiming = time.time_ns()
+    jobs = await claim_jobs_by_ids(db, job_ids)
+    WORKER_STAGE_DURATION_SECONDS.labels(stage="claim").observe(time.perf_counter() - started)
+    claimed_at = time.time_ns()
+    for job in jobs:
+        record_job_span("job.claim", job, claiming, claimed_at)
+    observe_queue_wait(jobs)
+
+    claimed = {str(job.id) for job in jobs}
+    for job_id in job_ids:
+        if job_id not in claimed:
+            log.info("job_not_claimed", extra={"job_id": job_id})
+
+    fan_outs = await asyncio.gather(*(execute_job(job) for job in jobs))
+    # the session can't be shared by concurrent queries: follow-ups run one by one
+    children, parents = await settle_jobs(db, jobs, fan_outs)
+    return [*jobs, *parents], children
+
+
+def observe_queue_wait(jobs: list[Job]) -> None:
+    # from when the job became due: a retry's backoff (run_after) is not waiting for a worker
+    now = datetime.now(timezone.utc)
+    for job in jobs:
+        due = job.run_after or job.created_at
+        WORKER_JOB_QUEUE_WAIT_SECONDS.labels(queue=job.queue).observe(max(0.0, (now - due).total_seconds()))
+        record_job_span("job.queue_wait", job, due, now)
+
+
+async def execute_job(job: Job) -> FanOut | None:
+    """
+        Runs the handler for a claimed job and records the outcome on the row.
+        A handler that splits the job returns FanOut: the job stays running and
+        the FanOut is handed back for settle_jobs() to create the children.
+        """
+    now = datetime.now(timezone.utc)
+
+    spec = get_handler(job.type)
+    if spec is not None and at_capacity(spec):
+        # Concept: don't hold a slot and an open transaction while waiting for a per-type slot;
+        # put it back and let the delayed set hand it out again shortly.
+        unclaim_job(job)
+        job.run_after = now + timedelta(seconds=settings.defer_delay_seconds)
+        WORKER_JOB_DEFERRED_TOTAL.labels(job_type=job.type).inc()
+        log.info("job_deferred", extra={"job_id": str(job.id), "job_type": job.type})
         return
 
     WORKER_JOB_CLAIMED_TOTAL.labels(job_type=job.type).inc()
@@ -39,19 +117,21 @@ async def process_job(db: AsyncSession, job_id: str) -> None:
 
     log.info("job_claimed", extra={"job_id": str(job.id), "job_type": job.type})
 
-    now = datetime.now(timezone.utc)
-
     try:
-        if job.type == "csv_summary":
-            result = await handle_csv_summary(job)
-        elif job.type == "always_fail":
-            result = await handle_always_fail(job)
-        else:
+        if spec is None:
             raise ValueError(f"Unknown job type: {job.type}")
 
-        job.result = result
+        with job_span("job.handler", job):
+            result = await run_handler(spec, job_input(job))
+
+        if isinstance(result, FanOut):
+            WORKER_JOB_DURATION_SECONDS.labels(job_type=job.type).observe(time.perf_counter() - started)
+            return result
+
+        await store_result(job, result)
         job.status = JobStatus.succeeded
-        job.succeeded_at = now
+        # when the handler finished, so succeeded_at - started_at is the execution time
+        job.succeeded_at = datetime.now(timezone.utc)
         job.failed_at = None
         job.run_after = None
         job.error = None
@@ -63,6 +143,7 @@ async def process_job(db: AsyncSession, job_id: str) -> None:
         log.info("job_succeeded", extra={"job_id": str(job.id), "job_type": job.type})
 
     except Exception as e:
+        now = datetime.now(timezone.utc)
         job.error = str(e)
         job.last_error = str(e)
         job.last_error_at = now
@@ -90,14 +171,7 @@ async def process_job(db: AsyncSession, job_id: str) -> None:
                     "error": str(e),
                 },
             )
-
-            # re-enqueue after delay.
-            # sleep in a background task and push back.
-            async def requeue_later():
-                await asyncio.sleep(delay)
-                await redis_client.rpush(QUEUE_NAME, str(job.id))
-
-            asyncio.create_task(requeue_later())
+            # re-enqueue happens after commit via the delayed set, see run_reserved()
 
         else:
             job.status = JobStatus.failed
@@ -111,35 +185,128 @@ async def process_job(db: AsyncSession, job_id: str) -> None:
             )
 
 
-async def worker_loop() -> None:
-    while True:
-        # reserve one job reliably (queue -> processing)
-        raw = await reserve_job_id(timeout_seconds=5)
-        if raw is None:
-            continue
+async def run_reserved(raws: list[str]) -> None:
+    """
+        Runs the queue items reserved by one slot: one session, one transaction, one ack.
+        """
+    in_flight_jobs.update(raws)
+    try:
+        with batch_span(raws):
+            await run_reserved_jobs(raws)
+    finally:
+        in_flight_jobs.difference_update(raws)
+
 
+async def run_reserved_jobs(raws: list[str]) -> None:
+    job_ids: list[str] = []
+    bad: list[str] = []
+    for raw in raws:
         try:
-            job_id = normalize_job_id(raw)
+            job_ids.append(normalize_job_id(raw))
         except Exception:
-            # remove from processing so it doesn't block.
             log.exception("bad_queue_message", extra={"raw": raw})
-            await ack_job_id(raw)
-            continue
+            bad.append(raw)
+
+    if bad:
+        # drop the lease so it doesn't block.
+        await queue_backend.ack_job_ids(bad)
+    if not job_ids:
+        return
+
+    batch_started = time.perf_counter()
+    unsettled = job_ids  # reserved ids neither acked nor released yet
+    try:
+        # If worker crashes before commit, changes rollback and the leases expire.
+        async with AsyncSessionLocal() as db:
+            async with db.begin():
+                if len(job_ids) == 1:
+                    jobs, children = await process_job(db, job_ids[0])
+                else:
+                    jobs, children = await process_batch(db, job_ids)
+                committing = time.perf_counter()
+                committing_at = time.time_ns()
+        WORKER_STAGE_DURATION_SECONDS.labels(stage="commit").observe(time.perf_counter() - committing)
+        committed_at = time.time_ns()
+        for job in jobs:
+            record_job_span("job.commit", job, committing_at, committed_at)
+
+        # Schedule retries only once the queued status is committed,
+        # otherwise a promoted id could be reserved and skipped before the commit lands.
+        # Crash between commit and here: the lease is still held and expires (redis: the reaper repairs it).
+        retries: dict[str, dict[str, float]] = {}
+        for job in jobs:
+            if job.status == JobStatus.queued:
+                retries.setdefault(job.queue, {})[str(job.id)] = job.run_after.timestamp()
+        await queue_backend.schedule_retries(retries)
+
+        # Children were held before the commit: enqueueing releases them.
+        spawned: dict[str, list[str]] = {}
+        for child in children:
+            spawned.setdefault(child.queue, []).append(str(child.id))
+        await queue_backend.enqueue_job_ids(spawned)
+
+        # Ack only after successful DB commit, and only what this worker claimed:
+        # an id it reserved but could not claim may be a duplicate of a job another worker is running.
+        reserved = set(job_ids)
+        claimed = [job for job in jobs if str(job.id) in reserved]  # not the parents they completed
+        claimed_ids = {str(job.id) for job in claimed}
+        started = time.perf_counter()
+        acking_at = time.time_ns()
+        await queue_backend.ack_job_ids([job_id for job_id in job_ids if job_id in claimed_ids])
+        await queue_backend.release_unclaimed_job_ids([job_id for job_id in job_ids if job_id not in claimed_ids])
+        unsettled = []
+        WORKER_STAGE_DURATION_SECONDS.labels(stage="ack").observe(time.perf_counter() - started)
+        record_batch(claimed, time.perf_counter() - batch_started)
+        acked_at = time.time_ns()
+        for job in jobs:
+            record_job_span("job.ack", job, acking_at, acked_at)
+
+        # Wake API requests waiting on these jobs (long-poll, SSE).
+        await queue_backend.publish_job_events({str(job.id): job.status.value for job in jobs})
+
+    except Exception:
+        # Do NOT ack on failure.
+        # Jobs keep their leases and are requeued once those expire.
+        log.exception("job_processing_crashed", extra={"job_ids": job_ids})
+        await queue_backend.abandon_job_ids(unsettled)
+        await asyncio.sleep(1)
+
 
+async def worker_loop() -> None:
+    """
+        Runs up to worker_slots.limit slots at once (settings.worker_concurrency, resized by
+        worker.autoscaler when enabled), each slot holding up to settings.worker_batch_size jobs.
+        A slot is taken before reserving, so a reserved id never waits for a free slot.
+        Queues are tried in the order settings.worker_queue_policy picks for each reservation.
+        """
+    slots = worker_slots
+    selector = QueueSelector(parse_queues(settings.worker_queues), settings.worker_queue_policy)
+    # with one queue we can block on it; with several, re-check them every poll interval
+    wait_seconds = 5 if len(selector.names) == 1 else settings.poll_interval_seconds
+    in_flight: set[asyncio.Task] = set()
+
+    while True:
+        await slots.acquire()
         try:
-            # If worker crashes before commit, changes rollback and job remains in processing.
-            async with AsyncSessionLocal() as db:
-                async with db.begin():
-                    await process_job(db, job_id)  # your real processing function
+            # reserve jobs reliably (queue -> leases)
+            raws = await queue_backend.reserve_job_ids(
+                selector.order(),
+                settings.worker_batch_size,
+                settings.lease_seconds,
+                timeout_seconds=wait_seconds,
+            )
+        except BaseException:
+            slots.release()
+            raise
 
-            # Ack only after successful DB commit.
-            await ack_job_id(job_id)
+        if not raws:
+            slots.release()
+            continue
 
-        except Exception:
-            # Do NOT ack on failure.
-            # Job stays in processing and can be requeued.
-            log.exception("job_processing_crashed", extra={"job_id": job_id})
-            await asyncio.sleep(1)
+        task = asyncio.create_task(run_reserved(raws))
+        in_flight.add(task)  # keep a strong reference until the task is done
+        task.add_done_callback(in_flight.discard)
+        task.add_done_callback(lambda _: slots.release())
 
 def normalize_job_id(raw: str) -> str:
     """
@@ -148,29 +315,30 @@ def normalize_job_id(raw: str) -> str:
         """
     return str(uuid.UUID(raw))
 
-def parse_queue_item(raw: str) -> str:
-    raw = raw.strip()
-
-    if raw.startswith("{"):
-        data = json.loads(raw)
-        raw = data["job_id"]
-
-    # validate UUID and normalize
-    return str(uuid.UUID(raw))
-
 async def main_async() -> None:
     """
     Top-level async runner.
       - worker_loop(): reserves and processes jobs
-      - requeue_stuck_jobs(): repairs jobs stuck in processing after crashes
+      - the queue backend's own loops; for redis:
+          requeue_stuck_jobs(): repairs jobs whose lease expired after crashes
+          promote_delayed_retries(): moves due retries from the delayed set to the queue
+          heartbeat_loop(): registers the worker and renews leases of in-flight jobs
+        for postgres: the LISTEN connection that wakes idle slots
+      - enforce_retention(): archives finished jobs and drops expired archive partitions
+      - sample_queue_metrics(): keeps the queue depth / oldest job gauges current
+      - autoscale_concurrency(): resizes worker_loop()'s slots to the load (off by default)
     """
     await asyncio.gather(
-        worker_loop(),         # Concept: main worker consumer loop
-        requeue_stuck_jobs(),  # Concept: reaper loop running in parallel
+        worker_loop(),              # Concept: main worker consumer loop
+        *queue_backend.background_tasks(),
+        enforce_retention(),        # Concept: bounded hot table (off by default)
+        sample_queue_metrics(),     # Concept: cheap, periodic queue gauges
+        autoscale_concurrency(),    # Concept: concurrency follows the queue-wait target
     )
 
 def main() -> None:
     setup_logging()
+    setup_tracing()
     start_http_server(settings.metrics_port)
     asyncio.run(main_async())
 
@@ -2,7 +2,7 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import JSON, DateTime, Enum, String, Text, func, Integer, text
+from sqlalchemy import JSON, DateTime, Enum, ForeignKey, Index, String, Text, func, Integer, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
@@ -17,23 +17,50 @@ class JobStatus(str, enum.Enum):
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        # GET /jobs: keyset pagination on (created_at, id), optionally filtered by status or type
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+        Index("ix_jobs_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_jobs_type_created_at_id", "type", "created_at", "id"),
+        Index("ix_jobs_updated_at", "updated_at"),
+        Index("ix_jobs_queued_run_after", "run_after", postgresql_where=text("status = 'queued'")),
+        # postgres queue backend: oldest queued jobs of a queue
+        Index("ix_jobs_queued_queue_created_at", "queue", "created_at", postgresql_where=text("status = 'queued'")),
+        # retention: finished top-level jobs, oldest first (see worker.retention)
+        Index(
+            "ix_jobs_finished_updated_at",
+            "updated_at",
+            postgresql_where=text("parent_id IS NULL AND status IN ('succeeded', 'failed')"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     type: Mapped[str] = mapped_column(String(50), nullable=False)
+    queue: Mapped[str] = mapped_column(String(50), nullable=False, default="default", server_default="default")
     payload: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
-    result: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # deferred: the worker only writes results, so claims don't read them back
+    result: Mapped[dict | None] = mapped_column(JSON, nullable=True, deferred=True)
+    # set instead of result when the result was offloaded to the result store
+    result_ref: Mapped[str | None] = mapped_column(String(80), nullable=True)
+    # set on the child jobs of a fanned-out job; the parent completes when its children do
+    parent_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("jobs.id", ondelete="CASCADE"), nullable=True, index=True
+    )
 
     idempotency_key: Mapped[str | None] = mapped_column(String(128), nullable=True, unique=True, index=True)
 
     attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
     max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("5"))
     run_after: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
+    # postgres queue backend: a reserved job is skipped by other workers until then; cleared by the claim
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # W3C trace context (traceparent, tracestate) of the request that created the job; see core.tracing
+    trace_context: Mapped[dict | None] = mapped_column(JSON(none_as_null=True), nullable=True)
 
     status: Mapped[JobStatus] = mapped_column(
         Enum(JobStatus, name="job_status"),
         nullable=False,
         default=JobStatus.queued,
-        index=True
     )
 
     started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -1,43 +1,133 @@
 import asyncio
+import time
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import select
+from sqlalchemy import any_, bindparam, exists, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from worker.core.config import settings
 from worker.db.session import AsyncSessionLocal
 from worker.models.job import Job, JobStatus
-from worker.core.redis import redis_client, QUEUE_NAME, PROCESSING_NAME
+from worker.core.redis import (
+    DEFAULT_QUEUE,
+    expired_leases,
+    release_expired_leases,
+    requeue_legacy_processing,
+)
+
+_child = aliased(Job)
+# a fanned-out parent stays running until its children complete it (see worker.fanout)
+_fanned_out = exists().where(_child.parent_id == Job.id)
 
 
 async def requeue_stuck_jobs() -> None:
     """
     Watchdog.
-    Requeues jobs that are stuck in processing but are still queued in DB
-    and ready to run.
+    Live workers keep renewing their leases (see worker.heartbeat), so an expired
+    lease means the worker is gone or badly stalled.
+    Only looks at expired leases (bounded batch per pass), so its cost scales with
+    the number of stuck jobs, not with the number of jobs in flight.
     """
+    await requeue_legacy_processing()
+
     while True:
-        items = await redis_client.lrange(PROCESSING_NAME, 0, -1)
-        if items:
-            now = datetime.now(timezone.utc)
-            async with AsyncSessionLocal() as db:
-                for job_id_str in items:
-                    try:
-                        job_uuid = uuid.UUID(job_id_str)
-                    except ValueError:
-                        # garbage in redis -> drop it
-                        await redis_client.lrem(PROCESSING_NAME, 1, job_id_str)
-                        continue
-
-                    res = await db.execute(select(Job).where(Job.id == job_uuid))
-                    job = res.scalar_one_or_none()
-                    if job is None:
-                        # job deleted? drop it from processing
-                        await redis_client.lrem(PROCESSING_NAME, 1, job_id_str)
-                        continue
-
-                    # Only requeue if DB says it's queued and it's eligible to run now
-                    if job.status == JobStatus.queued and (job.run_after is None or job.run_after <= now):
-                        # push back to queue and remove from processing
-                        await redis_client.rpush(QUEUE_NAME, job_id_str)
-                        await redis_client.lrem(PROCESSING_NAME, 1, job_id_str)
-
-        await asyncio.sleep(5)
\ No newline at end of file
+        now = time.time()
+        job_ids = await expired_leases(now, settings.reaper_batch_size)
+        if job_ids:
+            await reap_expired(job_ids, now)
+
+        # a full batch means there may be more expired leases right now
+        if len(job_ids) < settings.reaper_batch_size:
+            await asyncio.sleep(settings.reaper_interval_seconds)
+
+
+async def reap_expired(job_ids: list[str], now: float) -> None:
+    # queue -> [(action, job_id, score)]; unknown ids are only dropped, so any queue will do
+    actions: dict[str, list[tuple[str, str, float]]] = {DEFAULT_QUEUE: []}
+
+    job_uuids: dict[uuid.UUID, str] = {}
+    for job_id_str in job_ids:
+        try:
+            job_uuids[uuid.UUID(job_id_str)] = job_id_str
+        except ValueError:
+            # garbage in redis -> drop it
+            actions[DEFAULT_QUEUE].append(("drop", job_id_str, 0))
+
+    now_dt = datetime.fromtimestamp(now, timezone.utc)
+
+    async with AsyncSessionLocal() as db:
+        res = await db.execute(
+            select(Job.id, Job.queue, Job.status, Job.run_after, _fanned_out.label("fanned_out"))
+            .where(Job.id == any_(bindparam("ids", list(job_uuids), type_=ARRAY(UUID(as_uuid=True)))))
+        )
+        rows = {row.id: row for row in res}
+
+        stale_running = [
+            job_uuid for job_uuid, row in rows.items() if row.status == JobStatus.running and not row.fanned_out
+        ]
+        reset = await reset_abandoned_jobs(db, stale_running, now_dt) if stale_running else set()
+
+    for job_uuid, job_id_str in job_uuids.items():
+        row = rows.get(job_uuid)
+        if row is None:
+            # job deleted? drop the lease
+            actions[DEFAULT_QUEUE].append(("drop", job_id_str, 0))
+            continue
+
+        queue_actions = actions.setdefault(row.queue, [])
+        if row.status in (JobStatus.succeeded, JobStatus.failed):
+            # committed but the worker died before acking
+            queue_actions.append(("drop", job_id_str, 0))
+        elif row.status == JobStatus.running:
+            if row.fanned_out:
+                # committed with its children, the worker died before acking: the children run it now
+                queue_actions.append(("drop", job_id_str, 0))
+            elif job_uuid in reset:
+                # owner stopped heartbeating: run it again
+                queue_actions.append(("requeue", job_id_str, 0))
+            else:
+                # row is locked, so its worker is alive (just late on heartbeats)
+                queue_actions.append(("extend", job_id_str, now + settings.lease_seconds))
+        elif row.status == JobStatus.queued:
+            if row.run_after is None or row.run_after <= now_dt:
+                # eligible to run now: push back to queue
+                queue_actions.append(("requeue", job_id_str, 0))
+            else:
+                # retry committed but never scheduled: hand it to the delayed set
+                queue_actions.append(("delay", job_id_str, row.run_after.timestamp()))
+
+    for queue, queue_actions in actions.items():
+        await release_expired_leases(now, queue_actions, queue)
+
+
+async def reset_abandoned_jobs(db: AsyncSession, job_uuids: list[uuid.UUID], now: datetime) -> set[uuid.UUID]:
+    """
+    Puts running jobs whose lease expired back to queued.
+    Rows still locked by a live transaction are skipped, not waited on.
+    Fanned-out parents are never reset: run again, they would spawn a second set of children.
+    """
+    abandoned = (
+        select(Job.id)
+        .where(Job.id == any_(bindparam("ids", job_uuids, type_=ARRAY(UUID(as_uuid=True)))))
+        .where(Job.status == JobStatus.running)
+        .where(~_fanned_out)
+        .with_for_update(skip_locked=True)
+    )
+    res = await db.execute(
+        update(Job)
+        .where(Job.id.in_(abandoned))
+        .values(
+            status=JobStatus.queued,
+            run_after=None,
+            last_error="lease expired: worker stopped heartbeating",
+            last_error_at=now,
+            updated_at=now,
+        )
+        .returning(Job.id)
+        .execution_options(synchronize_session=False)
+    )
+    reset = set(res.scalars().all())
+    await db.commit()
+    return reset
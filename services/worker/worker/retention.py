@@ -0,0 +1,192 @@
+import asyncio
+import gzip
+import logging
+import os
+import re
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from worker.core.config import settings
+from worker.core.metrics import WORKER_ARCHIVE_PARTITIONS_DROPPED_TOTAL, WORKER_JOBS_ARCHIVED_TOTAL
+from worker.db.session import AsyncSessionLocal, engine
+
+log = logging.getLogger("worker")
+
+# same constant in every worker: one retention pass at a time across all of them
+RETENTION_LOCK_ID = 7_260_413
+
+ARCHIVE_COLUMNS = (
+    "id, type, queue, parent_id, payload, result, result_ref, idempotency_key, attempts, max_attempts, "
+    "run_after, status, started_at, succeeded_at, failed_at, error, last_error, last_error_at, "
+    "created_at, updated_at"
+)
+
+_PARTITION_NAME = re.compile(r"^jobs_archive_(\d{4})_(\d{2})$")
+
+_ids = bindparam("ids", type_=ARRAY(UUID(as_uuid=True)))
+
+# Finished top-level jobs, oldest first. A job moves together with its children,
+# and not before all of them are finished (a failed parent may still have running ones).
+_pick = text("""
+    SELECT j.id FROM jobs j
+    WHERE j.parent_id IS NULL
+      AND j.status IN ('succeeded', 'failed')
+      AND j.updated_at < :cutoff
+      AND NOT EXISTS (
+          SELECT 1 FROM jobs c WHERE c.parent_id = j.id AND c.status NOT IN ('succeeded', 'failed')
+      )
+    ORDER BY j.updated_at
+    LIMIT :limit
+    FOR UPDATE OF j SKIP LOCKED
+""")
+
+_months = text("""
+    SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC')
+    FROM jobs WHERE id = ANY(:ids) OR parent_id = ANY(:ids)
+""").bindparams(_ids)
+
+_move = text(f"""
+    WITH moved AS (
+        DELETE FROM jobs WHERE id = ANY(:ids) OR parent_id = ANY(:ids)
+        RETURNING {ARCHIVE_COLUMNS}
+    )
+    INSERT INTO jobs_archive ({ARCHIVE_COLUMNS}) SELECT {ARCHIVE_COLUMNS} FROM moved
+""").bindparams(_ids)
+
+
+async def enforce_retention() -> None:
+    """
+    Retention loop (off unless settings.retention_days or retention_archive_days is set).
+    Keeps the hot jobs table, and so the claim/reaper/API lookups, the size of recent work.
+    Safe to run in every worker: a pass only runs where the advisory lock was taken.
+    """
+    if not settings.retention_days and not settings.retention_archive_days:
+        return
+
+    while True:
+        try:
+            await retention_pass()
+        except Exception:
+            log.exception("retention_pass_failed")
+        await asyncio.sleep(settings.retention_interval_seconds)
+
+
+async def retention_pass() -> None:
+    async with engine.connect() as lock_conn:
+        locked = await lock_conn.scalar(text("SELECT pg_try_advisory_lock(:id)"), {"id": RETENTION_LOCK_ID})
+        await lock_conn.commit()
+        if not locked:
+            return
+        try:
+            now = datetime.now(timezone.utc)
+            if settings.retention_days:
+                await archive_finished_jobs(now - timedelta(days=settings.retention_days))
+            if settings.retention_archive_days:
+                await drop_expired_partitions(now - timedelta(days=settings.retention_archive_days))
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": RETENTION_LOCK_ID})
+            await lock_conn.commit()
+
+
+async def archive_finished_jobs(cutoff: datetime) -> int:
+    """
+    Moves jobs finished before cutoff to jobs_archive, in batches of settings.retention_batch_size
+    jobs, one short transaction each: row locks only, skipping rows somebody else holds.
+    """
+    total = 0
+    partitions: set[str] = set()
+    while True:
+        async with AsyncSessionLocal() as db:
+            async with db.begin():
+                res = await db.execute(_pick, {"cutoff": cutoff, "limit": settings.retention_batch_size})
+                ids = list(res.scalars().all())
+                if not ids:
+                    break
+
+                months = (await db.execute(_months, {"ids": ids})).scalars().all()
+                for month in months:
+                    await ensure_partition(db, month, partitions)
+
+                moved = (await db.execute(_move, {"ids": ids})).rowcount
+
+        total += moved
+        WORKER_JOBS_ARCHIVED_TOTAL.inc(moved)
+        if len(ids) < settings.retention_batch_size:
+            break
+
+    if total:
+        log.info("jobs_archived", extra={"rows": total, "cutoff": cutoff.isoformat()})
+    return total
+
+
+async def ensure_partition(db: AsyncSession, month: datetime, known: set[str]) -> None:
+    name = f"jobs_archive_{month:%Y_%m}"
+    if name in known:
+        return
+    start = month.replace(tzinfo=timezone.utc)
+    end = (start + timedelta(days=32)).replace(day=1)
+    await db.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF jobs_archive "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    known.add(name)
+
+
+async def drop_expired_partitions(cutoff: datetime) -> None:
+    """
+    Drops archive partitions whose whole month is before cutoff: a DROP TABLE, not a DELETE,
+    so no dead rows and no vacuum. Detached CONCURRENTLY first, so readers of jobs_archive are never blocked.
+    """
+    async with engine.connect() as conn:
+        res = await conn.execute(text("""
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = 'jobs_archive'
+        """))
+        names = sorted(res.scalars().all())
+        await conn.commit()
+
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match is None:
+            continue
+        start = datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc)
+        end = (start + timedelta(days=32)).replace(day=1)
+        if end > cutoff:
+            continue
+
+        if settings.retention_export_dir:
+            await export_partition(name)
+
+        async with engine.connect() as conn:
+            # DETACH ... CONCURRENTLY can't run inside a transaction block
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text(f"ALTER TABLE jobs_archive DETACH PARTITION {name} CONCURRENTLY"))
+            await conn.execute(text(f"DROP TABLE {name}"))
+
+        WORKER_ARCHIVE_PARTITIONS_DROPPED_TOTAL.inc()
+        log.info("archive_partition_dropped", extra={"partition": name})
+
+
+async def export_partition(name: str) -> None:
+    """
+    Streams a partition to <retention_export_dir>/<name>.jsonl.gz, one row_to_json per line,
+    through a server-side cursor, so memory stays flat. Renamed into place when complete.
+    """
+    path = os.path.join(settings.retention_export_dir, f"{name}.jsonl.gz")
+    tmp = f"{path}.tmp"
+    os.makedirs(settings.retention_export_dir, exist_ok=True)
+
+    rows = 0
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        async with engine.connect() as conn:
+            result = await conn.stream(text(f"SELECT row_to_json(t)::text FROM {name} t"))
+            async for lines in result.scalars().partitions(1000):
+                await asyncio.to_thread(f.write, "\n".join(lines) + "\n")
+                rows += len(lines)
+    os.replace(tmp, path)
+    log.info("archive_partition_exported", extra={"partition": name, "rows": rows, "path": path})
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+
+from sqlalchemy import text
+
+from worker.backends import queue_backend
+from worker.core.config import settings
+from worker.core.metrics import (
+    WORKER_QUEUE_BROKER_ENTRIES,
+    WORKER_QUEUE_JOBS,
+    WORKER_QUEUE_OLDEST_READY_AGE_SECONDS,
+)
+from worker.core.queues import parse_queues
+from worker.db.session import engine
+
+log = logging.getLogger("worker")
+
+# Unfinished jobs only (status prefix of ix_jobs_status_created_at_id), so the cost follows
+# the backlog, not the size of the table.
+_queue_stats = text("""
+    SELECT queue,
+           count(*) FILTER (WHERE status = 'queued' AND (run_after IS NULL OR run_after <= now())) AS ready,
+           count(*) FILTER (WHERE status = 'queued' AND run_after > now()) AS delayed,
+           count(*) FILTER (WHERE status = 'running') AS running,
+           extract(epoch FROM now() - min(coalesce(run_after, created_at))
+               FILTER (WHERE status = 'queued' AND (run_after IS NULL OR run_after <= now()))) AS oldest_ready
+    FROM jobs
+    WHERE status IN ('queued', 'running')
+    GROUP BY queue
+""")
+
+
+async def sample_queue_metrics() -> None:
+    """
+    Refreshes the queue gauges every settings.metrics_sample_interval_seconds (0 = off):
+    one grouped query on the jobs table plus one round trip to the queue backend,
+    instead of a count per scrape. Queues this worker serves read 0 when they are empty.
+    """
+    if not settings.metrics_sample_interval_seconds:
+        return
+    queues = [q.name for q in parse_queues(settings.worker_queues)]
+
+    while True:
+        try:
+            await sample_once(queues)
+        except Exception:
+            log.exception("metrics_sample_failed")
+        await asyncio.sleep(settings.metrics_sample_interval_seconds)
+
+
+async def read_queue_stats() -> dict:
+    """
+    queue -> row (ready, delayed, running, oldest_ready seconds or None), for queues with unfinished jobs.
+    """
+    async with engine.connect() as conn:
+        rows = (await conn.execute(_queue_stats)).all()
+    return {row.queue: row for row in rows}
+
+
+async def sample_once(queues: list[str]) -> None:
+    by_queue = await read_queue_stats()
+    seen = set(queues) | set(by_queue)
+    for queue in seen:
+        row = by_queue.get(queue)
+        WORKER_QUEUE_JOBS.labels(queue=queue, state="ready").set(row.ready if row else 0)
+        WORKER_QUEUE_JOBS.labels(queue=queue, state="delayed").set(row.delayed if row else 0)
+        WORKER_QUEUE_JOBS.labels(queue=queue, state="running").set(row.running if row else 0)
+        oldest = row.oldest_ready if row is not None and row.oldest_ready is not None else 0
+        WORKER_QUEUE_OLDEST_READY_AGE_SECONDS.labels(queue=queue).set(max(0.0, float(oldest)))
+
+    for (queue, state), entries in (await queue_backend.sample(queues)).items():
+        WORKER_QUEUE_BROKER_ENTRIES.labels(queue=queue, state=state).set(entries)
@@ -0,0 +1,26 @@
+import asyncio
+import time
+
+from worker.core.config import settings
+from worker.core.queues import parse_queues
+from worker.core.redis import promote_due_retries
+
+
+async def promote_delayed_retries(promote=promote_due_retries) -> None:
+    """
+    Delayed-retry promoter.
+    Moves retries whose run_after has passed from the delayed sets into their queues
+    (for the queues this worker serves), with promote(queue, now, limit): lists by default.
+    Safe to run in every worker: each batch is moved by one atomic script.
+    """
+    queues = [q.name for q in parse_queues(settings.worker_queues)]
+
+    while True:
+        backlog = False
+        for queue in queues:
+            moved = await promote(queue, time.time(), settings.retry_promote_batch_size)
+            # a full batch means more may be due right now
+            backlog = backlog or moved >= settings.retry_promote_batch_size
+
+        if not backlog:
+            await asyncio.sleep(settings.retry_promote_interval_seconds)